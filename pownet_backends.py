@@ -0,0 +1,227 @@
+import argparse
+import json
+import math
+import os
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from pyomo.opt import SolverFactory, SolverStatus, TerminationCondition
+import pyomo.environ as pyo
+
+from pownet_datasetup import base_dir, list_scenarios, load_scenario
+
+
+######=================================================########
+######               Segment H.1                       ########
+######=================================================########
+
+####### Solver backends of the Pyomo engine
+# Each backend has a Pyomo interface (and an APPSI one for persistent solves, where Pyomo has it) and the
+# native names of the common settings: solver threads, time limit (seconds) and relative MIP gap. A setting
+# of None is left to the solver; a backend without the option (None) is single-threaded or has no such limit.
+# Besides the backend names, the name of one of its Pyomo interfaces selects it (e.g. appsi_highs).
+# The order of the backends is the order of preference of solver_name='auto' without a calibration (Segment H.3).
+
+backends = {
+    'gurobi': SimpleNamespace(pyomo='gurobi', persistent='appsi_gurobi', threads='Threads', time_limit='TimeLimit', mip_gap='MIPGap'),
+    'highs':  SimpleNamespace(pyomo='highs', persistent='appsi_highs', threads='threads', time_limit='time_limit', mip_gap='mip_rel_gap'),
+    'scip':   SimpleNamespace(pyomo='scip', persistent=None, threads=None, time_limit='limits/time', mip_gap='limits/gap'),
+    'cbc':    SimpleNamespace(pyomo='cbc', persistent='appsi_cbc', threads='threads', time_limit='sec', mip_gap='ratio'),
+    'glpk':   SimpleNamespace(pyomo='glpk', persistent=None, threads=None, time_limit='tmlim', mip_gap='mipgap'),
+}
+calibration_file = os.path.join(base_dir, 'cache', 'solver_calibration.json')
+
+
+def solver_backend(solver_name):
+    for name, b in backends.items():
+        if solver_name in (name, b.pyomo, b.persistent):
+            return name, b
+    raise ValueError('unknown solver %s, expected one of %s' % (solver_name, ', '.join(backends)))
+
+
+def installed(name):
+    opt = SolverFactory(backends[name].pyomo)
+    return bool(opt.available(exception_flag=False)) and bool(opt.license_is_valid())
+
+
+def installed_backends():
+    return [name for name in backends if installed(name)]
+
+
+####### Pyomo solver of a backend with the common settings
+def make_solver(solver_name, persistent=False, threads=1, time_limit=None, mip_gap=None):
+    if solver_name == 'auto':
+        solver_name = pick_solver(persistent)
+    name, b = solver_backend(solver_name)
+    if persistent:
+        if b.persistent is None:
+            raise ValueError('%s has no persistent interface in Pyomo' % name)
+        interface = b.persistent
+    else:
+        interface = b.pyomo if solver_name == name else solver_name
+    opt = SolverFactory(interface)
+    if not opt.available(exception_flag=False):
+        raise RuntimeError('%s is not installed (installed: %s)' % (interface, ', '.join(installed_backends()) or 'none'))
+    for setting, value in [('threads', threads), ('time_limit', time_limit), ('mip_gap', mip_gap)]:
+        option = getattr(b, setting)
+        if value is not None and option is not None:
+            opt.options[option] = value
+    return opt
+
+
+######=================================================########
+######               Segment H.2                       ########
+######=================================================########
+
+####### Status of a solve, the same for every backend:
+#   optimal - solved to the gap
+#   limit   - stopped at the time or iteration limit (or interrupted) with a feasible solution
+#   feasible - other termination with a feasible solution
+#   no_solution - stopped at a limit before finding a feasible solution (nothing is loaded)
+# Any other solve without a feasible solution (infeasible, unbounded, solver error) raises a RuntimeError, as in
+# the matrix engine.
+limit_conditions = [TerminationCondition.maxTimeLimit, TerminationCondition.maxIterations,
+                    TerminationCondition.maxEvaluations, TerminationCondition.userInterrupt,
+                    TerminationCondition.resourceInterrupt]
+
+def condition_status(condition):
+    if condition in (TerminationCondition.optimal, TerminationCondition.globallyOptimal):
+        return 'optimal'
+    if condition in limit_conditions:
+        return 'limit'
+    return 'feasible'
+
+
+def result_status(result):
+    return condition_status(result.solver.termination_condition)
+
+
+####### Load the solution of a solve made with load_solutions=False into the instance; returns its status
+def load_result(instance, result, solver_name):
+    condition = result.solver.termination_condition
+    if len(result.solution) == 0:
+        if condition in limit_conditions:
+            return 'no_solution'
+        raise RuntimeError('%s: no feasible solution (%s, %s)' % (solver_name, result.solver.status, condition))
+    status = result_status(result)
+    ##the status is reported by the caller, so the solution of a solve stopped at a limit loads without a warning
+    result.solver.status = SolverStatus.ok
+    instance.solutions.load_from(result)
+    return status
+
+
+####### Time spent in the solver itself, where its Pyomo interface reports it (None otherwise, e.g. APPSI);
+####### the rest of a solve call is Pyomo writing or updating the model and reading the results back
+def solver_time(result):
+    timing = getattr(result, 'timing_info', None)
+    if isinstance(timing, dict) and 'timer' in timing:
+        return timing['timer'].get_total_time('optimize')
+    for key in ['wallclock_time', 'time']:
+        value = getattr(result.solver, key, None)
+        if isinstance(value, (int, float)):
+            return float(value)
+    return None
+
+
+####### Statistics of a solve: termination, objective, best bound, relative gap, branch-and-bound nodes and
+####### simplex iterations, None where the interface does not report them (the model minimizes SystemCost,
+####### so the objective is the upper bound). HiGHS is asked directly for its counts, which Pyomo does not pass on.
+def number(value):
+    return float(value) if isinstance(value, (int, float)) and math.isfinite(value) else None
+
+
+def relative_gap(objective, bound):
+    if objective is None or bound is None:
+        return None
+    return abs(objective - bound) / max(abs(objective), 1e-10)
+
+
+def solve_statistics(opt, result):
+    objective, bound = number(result.problem.upper_bound), number(result.problem.lower_bound)
+    stats = {'termination': str(result.solver.termination_condition), 'objective': objective, 'bound': bound,
+             'gap': relative_gap(objective, bound), 'nodes': None, 'iterations': None}
+    highs = getattr(opt, '_solver_model', None)
+    if hasattr(highs, 'getInfo'):
+        info = highs.getInfo()
+        stats['nodes'] = info.mip_node_count if info.mip_node_count >= 0 else None
+        stats['iterations'] = info.simplex_iteration_count if info.simplex_iteration_count >= 0 else None
+    elif hasattr(result.solver, 'statistics'): ##shell interfaces (e.g. cbc) that read them from the solver log
+        statistics = result.solver.statistics
+        stats['nodes'] = number(statistics.branch_and_bound.number_of_created_subproblems)
+        stats['iterations'] = number(statistics.black_box.number_of_iterations)
+    return stats
+
+
+######=================================================########
+######               Segment H.3                       ########
+######=================================================########
+
+####### Calibration: solve a sample of days of a scenario with each installed backend and record the fastest in
+####### calibration_file, which solver_name='auto' then uses (the first installed backend in the order of
+####### `backends` without a calibration); for persistent solves only backends with an APPSI interface are picked
+def pick_solver(persistent=False):
+    names = [name for name in installed_backends() if not persistent or backends[name].persistent is not None]
+    if not names:
+        raise RuntimeError('no %ssolver installed, of %s' % ('persistent ' if persistent else '',
+                           ', '.join(name for name in backends if not persistent or backends[name].persistent is not None)))
+    if os.path.exists(calibration_file):
+        with open(calibration_file) as f:
+            fastest = json.load(f)['solver']
+        if fastest in names:
+            return fastest
+    return names[0]
+
+
+def calibrate(d, days, names=None, threads=1, rel_tol=1e-4):
+    import pownet_solver
+    available = installed_backends()
+    names = names or available
+    skipped = [name for name in names if name not in available]
+    if skipped:
+        print('Skipped (not installed):', ', '.join(skipped))
+    names = [name for name in names if name in available]
+    if not names:
+        raise RuntimeError('none of the solvers to time is installed (installed: %s)' % (', '.join(available) or 'none'))
+    K = range(1, d.HorizonHours+1)
+    gens = d.df_gen['name'].str.replace(' ','_').tolist()
+    ini_on, ini_mwh = dict(zip(gens, d.df_gen['ini_on'])), dict(zip(gens, d.df_gen['ini_mwh']))
+    times, objectives = {}, {}
+    for name in names:
+        s = pownet_solver.build_step_solver(d, solver_name=name, threads=threads)
+        times[name], objectives[name] = 0.0, []
+        for day in days:
+            t0 = (day-1)*24
+            T = {i: min(t0+i,d.SimHours) for i in K}
+            t = time.perf_counter()
+            pownet_solver.solve_step(s, T, K, ini_on, ini_mwh)
+            times[name] += time.perf_counter() - t
+            objectives[name].append(pyo.value(s.instance.SystemCost))
+        print('%-8s %8.2f s' % (name, times[name]))
+
+    ##a backend whose objectives differ from those of the fastest (e.g. with a larger default gap) is reported, not excluded
+    fastest = min(times, key=times.get)
+    for name in names:
+        if any(abs(a-b) > rel_tol*max(abs(b),1) for a, b in zip(objectives[name], objectives[fastest])):
+            print('%s: objectives differ from those of %s' % (name, fastest))
+
+    record = {'solver': fastest, 'scenario': d.name, 'days': days, 'threads': threads,
+              'times': times, 'objectives': objectives, 'date': str(datetime.now())}
+    os.makedirs(os.path.dirname(calibration_file), exist_ok=True)
+    tmp = calibration_file + '.%d.tmp' % os.getpid()
+    with open(tmp, 'w') as f:
+        json.dump(record, f, indent=1)
+    os.replace(tmp, calibration_file)
+    return fastest
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Time the installed solvers on sample days of a scenario and record the fastest')
+    parser.add_argument('scenario', choices=list_scenarios())
+    parser.add_argument('--days', type=int, nargs='+', default=[15,105,196,288], help='days solved by each solver')
+    parser.add_argument('--solvers', nargs='+', choices=list(backends), help='solvers to time (default: all installed)')
+    parser.add_argument('--threads', type=int, default=1, help='solver threads')
+    args = parser.parse_args()
+
+    print('Installed:', ', '.join(installed_backends()) or 'none')
+    fastest = calibrate(load_scenario(args.scenario), args.days, args.solvers, args.threads)
+    print('Fastest: %s (recorded in %s)' % (fastest, calibration_file))
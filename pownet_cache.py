@@ -0,0 +1,52 @@
+import hashlib
+import os
+import pandas as pd
+import numpy as np
+
+
+######=================================================########
+######               Segment D.1                       ########
+######=================================================########
+
+# Bump when the cached layout changes so stale entries are never reused
+cache_version = 1
+
+
+def file_hash(filename):
+    # content hash of a file (independent of its path and modification time)
+    h = hashlib.sha256(b'pownet-cache-v%d' % cache_version)
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+######=================================================########
+######               Segment D.2                       ########
+######=================================================########
+
+####### Read a numeric CSV through the binary cache
+def read_csv_cached(filename, cache_dir=None):
+    # The parsed table is stored as a structured .npy (one field per column, original
+    # dtypes kept) named after the content hash of the CSV. Identical CSVs (e.g. in
+    # different input directories) share one entry; an edited CSV hashes to a new one.
+    # Tables with non-numeric columns are read without caching.
+    if cache_dir is None:
+        return pd.read_csv(filename, header=0)
+
+    path = os.path.join(cache_dir, file_hash(filename) + '.npy')
+    if os.path.exists(path):
+        return pd.DataFrame(np.load(path, mmap_mode='r'))
+
+    df = pd.read_csv(filename, header=0)
+    records = df.to_records(index=False)
+    if records.dtype.hasobject:
+        return df
+
+    # write to a private temporary file first so concurrent runs never see a partial entry
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = path + '.%d.tmp' % os.getpid()
+    with open(tmp, 'wb') as f:
+        np.save(f, np.asarray(records), allow_pickle=False)
+    os.replace(tmp, path)
+    return df
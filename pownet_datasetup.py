@@ -0,0 +1,718 @@
+import argparse
+import hashlib
+import io
+import json
+import os
+from types import SimpleNamespace
+import pandas as pd
+import numpy as np
+from pownet_cache import read_csv_cached
+
+base_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+######=================================================########
+######               Segment A.1                       ########
+######=================================================########
+
+####### Default settings (a scenario overlay can replace any of them)
+settings = {
+    'yr': 2023,           ##simulation year (varies for climate-dependent inputs)
+    'SimDays': 365,
+    'commit_hours': 24,   ##hours committed by each solve of the rolling horizon (step size)
+    'lookahead_hours': 0, ##hours solved beyond the committed ones and then discarded
+    'TransLoss': 0.075,   ##transmission loss as a percent of generation
+    'n1criterion': 0.75,  ##maximum line-usage as a percent of line-capacity
+    'res_margin': 0.15,   ##minimum reserve as a percent of system demand
+    'spin_margin': 0.50,  ##minimum spinning reserve as a percent of total reserve
+    'dense_lines': True,  ##write the full node-by-node line table (False: existing lines only)
+    'network': 'angles',  ##DC power flow: 'angles' (voltage angle at each node) or 'ptdf' (shift factors)
+    'ref_node': 'CORN2',  ##reference node of the network
+    'copper_plate': False, ##solve a single-bus model when no line limit can bind (checked at setup; no angles in the outputs)
+    'lp_fast_path': True, ##try an LP for the commitment when it has no integer structure (checked at setup)
+    'lp_gap': 1e-4,       ##relative gap to the LP bound within which the LP fast path is accepted
+}
+
+# Unit cost of generation of each fuel type
+gen_cost = {'gas':3.30, 'slack':53.5604, 'geothermal':0, 'hydrogen':6.82}
+
+input_dir = os.path.join(base_dir, 'input')         ##base dataset shared by all scenarios
+scenario_dir = os.path.join(base_dir, 'scenarios')  ##scenario overlays (<name>.json)
+cache_dir = os.path.join(base_dir, 'cache')         ##binary cache of the hourly input series (None: off)
+write_dat = True   ##export the model data to <workdir>/input/<data_name>.dat when run as a script
+scenario = 'BaU'   ##scenario prepared when run as a script
+
+
+######=================================================########
+######               Segment A.2                       ########
+######=================================================########
+
+####### Input tables
+def input_files(yr):
+    return {
+        'genparams': 'data_cornell_genparams.csv',                     # parameters for dispatchable resources
+        'deratef': 'data_cornell_genparams_deratef_'+str(yr)+'.csv',   # derate factors of dispatchable units
+        'hydro': 'data_cornell_hydro_'+str(yr)+'.csv',                 # hourly ts of dispatchable hydropower
+        'solar': 'data_cornell_solar_'+str(yr)+'.csv',                 # hourly ts of solar-power at each plant
+        'load': 'data_cornell_load_'+str(yr)+'.csv',                   # hourly ts of load
+        'transparam': 'data_cornell_transparam.csv',                   # transmission (one direction)
+    }
+
+# Tables of hourly series, read through the binary cache
+hourly_tables = ['deratef', 'hydro', 'solar', 'load']
+
+def read_table(name, filename):
+    if name in hourly_tables:
+        return read_csv_cached(filename, cache_dir)
+    return pd.read_csv(filename, header=0)
+
+# Base tables are read once per process and shared by every scenario built on them
+base_inputs = {}
+
+def read_inputs(yr):
+    key = (input_dir, yr)
+    if key not in base_inputs:
+        base_inputs[key] = {name: read_table(name, os.path.join(input_dir, fn)) for name, fn in input_files(yr).items()}
+    return base_inputs[key]
+
+
+######=================================================########
+######               Segment A.3                       ########
+######=================================================########
+
+####======== Lists of Nodes of the Power System ========########
+nodes = {
+    'h_nodes': ["BEBE"],                              # Hydro
+    's_nodes': ["MUSG","SNRD","HARF","GENE","CASC"],  # Solar
+    'gd_nodes': ["CORN1", "CORN2"],                   # Thermoplant nodes with demand
+    'gn_nodes': [],                                   # Thermoplants nodes without demand
+    'td_nodes': [],                                   # Transformers with demand
+    'tn_nodes': [],                                   # Transformers without demand
+}
+
+# Types of dispatchable units
+types = ['gas_st','slack','geothermal','hydrogen']
+
+####### Model data of one scenario, from its settings, unit costs, tables and node lists
+def setup_data(name, workdir, settings, gen_cost, tables, nodes):
+    d = SimpleNamespace(name=name, workdir=workdir, **settings)
+    d.SimHours = d.SimDays * 24
+    d.HorizonHours = d.commit_hours + d.lookahead_hours  ##planning horizon of each solve
+    d.gen_cost = gen_cost
+    d.data_name = 'pownet_data_cornell_'+str(d.yr)+''
+
+    # Parameters for dispatchable resources
+    d.df_gen = tables['genparams'].copy()
+    d.df_gen['gen_cost'] = d.df_gen['typ'].map(gen_cost)
+    d.df_gen['ini_on']=0
+    d.df_gen['ini_mwh']=0
+
+    # Hourly derate factors, hydropower, solar-power and load
+    d.df_gen_deratef = tables['deratef']
+    d.gen_units = list(d.df_gen_deratef.columns[4:])
+    d.df_hydro = tables['hydro']
+    d.df_solar = tables['solar']
+    d.df_load = tables['load']
+
+    # Hourly minimum reserve as a function of load (e.g., 15% of current load)
+    d.df_reserves = pd.DataFrame((d.df_load.iloc[:,4:].sum(axis=1)*d.res_margin).values,columns=['Reserve'])
+
+    # Transmission line (both directions)
+    df_trans1 = tables['transparam']
+    df_trans2 = pd.DataFrame([df_trans1['sink'],df_trans1['source'],df_trans1['linemva'],df_trans1['linesus']]).transpose()
+    df_trans2.columns = ['source','sink','linemva','linesus']
+    d.df_paths = pd.concat([df_trans1,df_trans2], axis=0)
+    d.df_paths.index = np.arange(len(d.df_paths))
+
+    # Index of transmission paths by (source, sink); a repeated pair keeps its last row
+    d.path_index = {}
+    for source, sink, linemva, linesus in d.df_paths[['source','sink','linemva','linesus']].itertuples(index=False):
+        d.path_index[(source,sink)] = (linemva,linesus)
+
+    # Node lists
+    for z_list, z_nodes in nodes.items():
+        setattr(d, z_list, list(z_nodes))
+    d.g_nodes = d.gd_nodes + d.gn_nodes
+    d.d_nodes = d.gd_nodes + d.td_nodes
+    d.all_nodes = d.h_nodes + d.gn_nodes + d.gd_nodes + d.tn_nodes + d.td_nodes + d.s_nodes
+
+    # Single bus (copper plate) when no line limit can bind
+    d.network_note = 'Network: %s' % d.network
+    if d.copper_plate:
+        reason = copper_plate_reason(d)
+        if reason:
+            d.network_note = 'Network: copperplate instead of %s (%s)' % (d.network, reason)
+            d.network = 'copperplate'
+
+    # Shift factors of the network (PTDF formulation only)
+    if d.network == 'ptdf':
+        d.ptdf = ptdf_matrix(d)
+
+    # Commitment without integer structure (LP fast path of pownet_solver.py)
+    d.lp_candidate = False
+    d.commitment_note = 'Commitment: MIP'
+    if d.lp_fast_path:
+        reason = trivial_commitment_reason(d)
+        d.lp_candidate = reason is None
+        if d.lp_candidate:
+            d.commitment_note = 'Commitment: LP fast path (mincap=0, minup=mindn=1, no fixed or start-up costs), MIP fallback'
+        else:
+            d.commitment_note = 'Commitment: MIP (%s)' % reason
+    return d
+
+
+####### Commitment structure check
+def trivial_commitment_reason(d):
+    # Without minimum output or minimum up/down times, the binaries only carry the fixed and
+    # start-up costs: rounding the commitment of the LP relaxation up (with the non-spinning
+    # reserve of the units turned on offered as spinning) keeps the relaxed dispatch feasible.
+    # With fixed or start-up costs the relaxation commits fractions of units and the rounded
+    # schedule is not within lp_gap of the LP bound, so those rule the LP out as well.
+    # Returns why that does not hold for some unit, or None when it holds for all of them.
+    columns = ['name','mincap','minup','mindn','fix_om','st_cost']
+    for unit, mincap, minup, mindn, fix_om, st_cost in d.df_gen[columns].itertuples(index=False):
+        if mincap > 0:
+            return '%s has mincap %s' % (unit, mincap)
+        if minup > 1 or mindn > 1:
+            return '%s has minup %s, mindn %s' % (unit, minup, mindn)
+        if fix_om > 0 or st_cost > 0:
+            return '%s has fix_om %s, st_cost %s' % (unit, fix_om, st_cost)
+    return None
+
+
+####### Copper plate check
+def copper_plate_reason(d):
+    # A line flow never exceeds the injection on one side of the system, i.e. the hourly
+    # generation available (after losses) or the hourly demand, whichever is lower, so no
+    # limit can bind when every rated line takes the peak of that injection.
+    # Returns the reason the network reduces to a single bus, or None when a limit may bind
+    # or the network is not connected.
+    pos = {z: n for n, z in enumerate(d.all_nodes)}
+    lines = [(s,k,linemva,linesus) for (s,k), (linemva, linesus) in d.path_index.items() if s in pos and k in pos]
+
+    # connected nodes through lines with susceptance
+    adjacent = {z: [] for z in d.all_nodes}
+    for s, k, linemva, linesus in lines:
+        if linesus != 0:
+            adjacent[s].append(k)
+            adjacent[k].append(s)
+    reached = {d.all_nodes[0]}
+    stack = [d.all_nodes[0]]
+    while stack:
+        for k in adjacent[stack.pop()]:
+            if k not in reached:
+                reached.add(k)
+                stack.append(k)
+    if len(reached) < len(d.all_nodes):
+        return None
+
+    # peak hourly injection
+    maxcap = d.df_gen.set_index(d.df_gen['name'].str.replace(' ','_'))['maxcap']
+    available = d.df_gen_deratef[d.gen_units].to_numpy(dtype=float) @ maxcap.reindex(d.gen_units).to_numpy(dtype=float)
+    available = available + d.df_hydro[d.h_nodes].to_numpy(dtype=float).sum(axis=1)
+    available = available + d.df_solar[d.s_nodes].to_numpy(dtype=float).sum(axis=1)
+    demand = d.df_load[d.d_nodes].to_numpy(dtype=float).sum(axis=1)
+    peak = np.minimum((1 - d.TransLoss) * available, demand).max()
+
+    limits = [d.n1criterion * linemva for s, k, linemva, linesus in lines if linemva > 0]
+    if limits and min(limits) < peak:
+        return None
+    return 'peak injection %0.1f MW, smallest line limit %s' % (peak, '%0.1f MW' % min(limits) if limits else 'none')
+
+
+####### Power transfer distribution factors
+def ptdf_matrix(d):
+    # Flow on each line (source, sink) per MW injected at each node and withdrawn at
+    # ref_node, from the same susceptances as the angle formulation: the bus matrix B
+    # has B[z,z] = sum of linesus[z,k] and B[z,k] = -linesus[z,k]; it is inverted with
+    # the reference row/column removed, and the flow is linesus[s,k]*(angle_s - angle_k)
+    pos = {z: n for n, z in enumerate(d.all_nodes)}
+    lines = [(s,k) for (s,k), (linemva, linesus) in d.path_index.items() if s in pos and k in pos and linesus != 0]
+    sus = np.array([d.path_index[l][1] for l in lines], dtype=float)
+    src = np.array([pos[s] for s, k in lines], dtype=int)
+    snk = np.array([pos[k] for s, k in lines], dtype=int)
+
+    n = len(d.all_nodes)
+    B = np.zeros((n, n))
+    np.add.at(B, (src, src), sus)
+    np.add.at(B, (src, snk), -sus)
+
+    keep = np.arange(n) != pos[d.ref_node]
+    X = np.zeros((n, n))
+    try:
+        X[np.ix_(keep, keep)] = np.linalg.inv(B[np.ix_(keep, keep)])
+    except np.linalg.LinAlgError:
+        raise ValueError('the network is not connected to the reference node %s' % d.ref_node)
+
+    ptdf = sus[:, None] * (X[src] - X[snk])
+    ptdf[np.abs(ptdf) < 1e-12] = 0
+    return pd.DataFrame(ptdf, index=pd.MultiIndex.from_tuples(lines, names=['source','sink']), columns=d.all_nodes)
+
+
+######====== vectorized writer for hourly param blocks ======########
+def write_hourly_param(f, name, df, columns=None):
+    # rows are 'node hour value' for each column of df, or 'hour value' when no
+    # columns are given (system-wide param); floats are written with repr so the
+    # block parses back to exactly the same values as the row-by-row writer
+    if columns is None:
+        values = df.to_numpy(dtype=float).ravel()
+        rows = np.empty(2*len(values), dtype=object)
+        rows[0::2] = range(1, len(values)+1)
+        rows[1::2] = values.tolist()
+        header = 'param' + '\t' + name + ':=' + '\n'
+        body = ('%d\t%r\n' * len(values)) % tuple(rows)
+    else:
+        values = df[columns].to_numpy(dtype=float)
+        n_hours = values.shape[0]
+        rows = np.empty(3*values.size, dtype=object)
+        rows[0::3] = np.repeat(np.array(columns, dtype=object), n_hours)
+        rows[1::3] = np.tile(np.arange(1, n_hours+1), len(columns)).tolist()
+        rows[2::3] = values.T.ravel().tolist()
+        header = 'param:' + '\t' + name + ':=' + '\n'
+        body = ('%s\t%d\t%r\n' * values.size) % tuple(rows)
+    f.write(header + body + ';\n\n')
+
+
+######=================================================########
+######               Segment A.4                       ########
+######=================================================########
+
+###### generator set (each unit is placed at its node by param node) and sets by type
+def write_gen_sets(f, d):
+    f.write('set Generators :=\n')
+    for gen in range(0,len(d.df_gen)):
+        unit_name = d.df_gen.loc[gen,'name']
+        unit_name = unit_name.replace(' ','_')
+        f.write(unit_name + ' ')
+    f.write(';\n\n')
+
+
+####### generator sets by type  
+    # Gas
+    f.write('set Gas :=\n')
+    # pull relevant generators
+    for gen in range(0,len(d.df_gen)):
+        if d.df_gen.loc[gen,'typ'] == 'gas':
+            unit_name = d.df_gen.loc[gen,'name']
+            unit_name = unit_name.replace(' ','_')
+            f.write(unit_name + ' ')
+    f.write(';\n\n')  
+
+    # Slack
+    f.write('set Slack :=\n')
+    # pull relevant generators
+    for gen in range(0,len(d.df_gen)):
+        if d.df_gen.loc[gen,'typ'] == 'slack':
+            unit_name = d.df_gen.loc[gen,'name']
+            unit_name = unit_name.replace(' ','_')
+            f.write(unit_name + ' ')
+    f.write(';\n\n')  
+
+    # Geothermal
+    f.write('set Geothermal :=\n')
+    # pull relevant generators
+    for gen in range(0,len(d.df_gen)):
+        if d.df_gen.loc[gen,'typ'] == 'geothermal':
+            unit_name = d.df_gen.loc[gen,'name']
+            unit_name = unit_name.replace(' ','_')
+            f.write(unit_name + ' ')
+    f.write(';\n\n')  
+
+    # Hydrogen
+    f.write('set Hydrogen :=\n')
+    # pull relevant generators
+    for gen in range(0,len(d.df_gen)):
+        if d.df_gen.loc[gen,'typ'] == 'hydrogen':
+            unit_name = d.df_gen.loc[gen,'name']
+            unit_name = unit_name.replace(' ','_')
+            f.write(unit_name + ' ')
+    f.write(';\n\n')
+
+
+######=================================================########
+######               Segment A.5                       ########
+######=================================================########
+
+######Set nodes, sources and sinks
+def write_node_sets(f, d):
+    # nodes
+    f.write('set nodes :=\n')
+    for z in d.all_nodes:
+        f.write(z + ' ')
+    f.write(';\n\n')
+
+    # sources
+    f.write('set sources :=\n')
+    for z in d.all_nodes:
+        f.write(z + ' ')
+    f.write(';\n\n')
+
+    # sinks
+    f.write('set sinks :=\n')
+    for z in d.all_nodes:
+        f.write(z + ' ')
+    f.write(';\n\n')
+
+    # hydro_nodes
+    f.write('set h_nodes :=\n')
+    for z in d.h_nodes:
+        f.write(z + ' ')
+    f.write(';\n\n')
+
+    # solar_nodes
+    f.write('set s_nodes :=\n')
+    for z in d.s_nodes:
+        f.write(z + ' ')
+    f.write(';\n\n')
+
+    # all demand nodes
+    f.write('set d_nodes :=\n')
+    for z in d.d_nodes:
+        f.write(z + ' ')
+    f.write(';\n\n')
+
+    # generator with demand nodes
+    f.write('set gd_nodes :=\n')
+    for z in d.gd_nodes:
+        f.write(z + ' ')
+    f.write(';\n\n')
+
+    # generator without demand nodes
+    f.write('set gn_nodes :=\n')
+    for z in d.gn_nodes:
+        f.write(z + ' ')
+    f.write(';\n\n')
+
+    # transformer with demand nodes
+    f.write('set td_nodes :=\n')
+    for z in d.td_nodes:
+        f.write(z + ' ')
+    f.write(';\n\n')
+
+    # transformer without demand nodes
+    f.write('set tn_nodes :=\n')
+    for z in d.tn_nodes:
+        f.write(z + ' ')
+    f.write(';\n\n')
+
+
+######=================================================########
+######               Segment A.6                       ########
+######=================================================########
+
+####### simulation period and horizon
+def write_settings(f, d):
+    f.write('param SimHours := %d;' % d.SimHours)
+    f.write('\n')
+    f.write('param SimDays:= %d;' % d.SimDays)
+    f.write('\n\n')   
+    f.write('param HorizonHours := %d;' % d.HorizonHours)
+    f.write('\n\n')
+    f.write('param TransLoss := %0.3f;' % d.TransLoss)
+    f.write('\n\n')
+    f.write('param n1criterion := %0.3f;' % d.n1criterion)
+    f.write('\n\n')
+    f.write('param spin_margin := %0.3f;' % d.spin_margin)
+    f.write('\n\n')
+
+
+######=================================================########
+######               Segment A.7                       ########
+######=================================================########
+
+####### create parameter matrix for generators
+def write_gen_params(f, d):
+    f.write('param:' + '\t')
+    for c in d.df_gen.columns:
+        if c != 'name':
+            f.write(c + '\t')
+    f.write(':=\n\n')
+    for i in range(0,len(d.df_gen)):    
+        for c in d.df_gen.columns:
+            if c == 'name':
+                unit_name = d.df_gen.loc[i,'name']
+                unit_name = unit_name.replace(' ','_')
+                f.write(unit_name + '\t')  
+            else:
+                f.write(str((d.df_gen.loc[i,c])) + '\t')               
+        f.write('\n')
+    f.write(';\n\n')
+
+
+######=================================================########
+######               Segment A.8                       ########
+######=================================================########
+
+####### create parameter matrix for transmission paths (source and sink connections)
+def write_lines(f, d):
+    f.write('param:' + '\t' + 'linemva' + '\t' +'linesus :=' + '\n')
+    if d.dense_lines:
+        for z in d.all_nodes:
+            for x in d.all_nodes:
+                linemva, linesus = d.path_index.get((z,x),(0,0))
+                f.write(z + '\t' + x + '\t' + str(linemva) + '\t' + str(linesus) + '\n')
+    else:
+        # pairs without a line fall back to the zero default in the model
+        node_set = set(d.all_nodes)
+        for (z,x), (linemva, linesus) in d.path_index.items():
+            if z in node_set and x in node_set:
+                f.write(z + '\t' + x + '\t' + str(linemva) + '\t' + str(linesus) + '\n')
+    f.write(';\n\n')
+
+
+####### DC power flow formulation, reference node and shift factors
+def write_network(f, d):
+    f.write('param network := %s;' % d.network)
+    f.write('\n\n')
+    f.write('param ref_node := %s;' % d.ref_node)
+    f.write('\n\n')
+    if d.network == 'ptdf':
+        f.write('param ptdf :=\n')
+        for (s,k), row in d.ptdf.iterrows():
+            for z, v in row.items():
+                if v != 0:
+                    f.write(s + '\t' + k + '\t' + z + '\t' + repr(float(v)) + '\n')
+        f.write(';\n\n')
+
+
+######=================================================########
+######               Segment A.9                       ########
+######=================================================########
+
+####### Blocks of the .dat file, in order: name, data it is generated from, writer
+def dat_blocks(d):
+    return [
+        ('gen_sets', [d.df_gen[['name','node','typ']], d.gd_nodes, d.gn_nodes], write_gen_sets),
+        ('node_sets', [d.all_nodes, d.h_nodes, d.s_nodes, d.d_nodes, d.gd_nodes, d.gn_nodes, d.td_nodes, d.tn_nodes], write_node_sets),
+        ('settings', [d.SimHours, d.SimDays, d.HorizonHours, d.TransLoss, d.n1criterion, d.spin_margin], write_settings),
+        ('gen_params', [d.df_gen], write_gen_params),
+        ('lines', [d.df_paths, d.all_nodes, d.dense_lines], write_lines),
+        ('network', [d.network, d.ref_node, d.df_paths, d.all_nodes], write_network),
+        # Hourly timeseries (load, hydro, solar, wind, reserve)
+        ('SimDemand', [d.df_load[d.d_nodes]], lambda f, d: write_hourly_param(f, 'SimDemand', d.df_load, d.d_nodes)),
+        ('SimHydro', [d.df_hydro[d.h_nodes]], lambda f, d: write_hourly_param(f, 'SimHydro', d.df_hydro, d.h_nodes)),
+        ('SimSolar', [d.df_solar[d.s_nodes]], lambda f, d: write_hourly_param(f, 'SimSolar', d.df_solar, d.s_nodes)),
+        ('SimDeratef', [d.df_gen_deratef[d.gen_units]], lambda f, d: write_hourly_param(f, 'SimDeratef', d.df_gen_deratef, d.gen_units)),
+        # System-wide hourly reserve
+        ('SimReserves', [d.df_reserves], lambda f, d: write_hourly_param(f, 'SimReserves', d.df_reserves)),
+    ]
+
+
+######====== write data.dat file ======########
+def write_dat_file(d, filename):
+    with open(filename, 'w') as f:
+        for name, deps, writer in dat_blocks(d):
+            writer(f, d)
+
+
+######=================================================########
+######               Segment A.10                      ########
+######=================================================########
+
+####### In-memory model data (same content as the .dat file, no text round-trip)
+def build_data(d):
+    data = {}
+
+    # generator set (units are placed at their nodes by param node)
+    names = d.df_gen['name'].str.replace(' ','_')
+    data['Generators'] = {None: names.tolist()}
+
+    # generator sets by type
+    for set_name, typ in [('Gas','gas'),('Slack','slack'),('Geothermal','geothermal'),('Hydrogen','hydrogen')]:
+        data[set_name] = {None: names[d.df_gen['typ'] == typ].tolist()}
+
+    # nodes, sources and sinks
+    data['nodes'] = {None: d.all_nodes}
+    data['sources'] = {None: d.all_nodes}
+    data['sinks'] = {None: d.all_nodes}
+    data['h_nodes'] = {None: d.h_nodes}
+    data['s_nodes'] = {None: d.s_nodes}
+    data['d_nodes'] = {None: d.d_nodes}
+    data['gd_nodes'] = {None: d.gd_nodes}
+    data['gn_nodes'] = {None: d.gn_nodes}
+    data['td_nodes'] = {None: d.td_nodes}
+    data['tn_nodes'] = {None: d.tn_nodes}
+
+    # simulation period, horizon and system-wide settings
+    data['SimHours'] = {None: d.SimHours}
+    data['SimDays'] = {None: d.SimDays}
+    data['HorizonHours'] = {None: d.HorizonHours}
+    data['TransLoss'] = {None: d.TransLoss}
+    data['n1criterion'] = {None: d.n1criterion}
+    data['spin_margin'] = {None: d.spin_margin}
+
+    # parameter matrix for generators (column headers may carry stray spaces)
+    for c in d.df_gen.columns:
+        if c != 'name':
+            data[c.strip()] = dict(zip(names, d.df_gen[c].tolist()))
+
+    # transmission paths (pairs without a line take the zero default)
+    node_set = set(d.all_nodes)
+    data['linemva'] = {k: v[0] for k, v in d.path_index.items() if k[0] in node_set and k[1] in node_set}
+    data['linesus'] = {k: v[1] for k, v in d.path_index.items() if k[0] in node_set and k[1] in node_set}
+
+    # DC power flow formulation, reference node and shift factors
+    data['network'] = {None: d.network}
+    data['ref_node'] = {None: d.ref_node}
+    if d.network == 'ptdf':
+        data['ptdf'] = {(s,k,z): float(v) for (s,k), row in d.ptdf.iterrows() for z, v in row.items() if v != 0}
+
+    # hourly timeseries (load, hydro, solar, deratef, reserve)
+    hours = range(1, d.SimHours+1)
+    for param, df, columns in [('SimDemand',d.df_load,d.d_nodes),('SimHydro',d.df_hydro,d.h_nodes),
+                               ('SimSolar',d.df_solar,d.s_nodes),('SimDeratef',d.df_gen_deratef,d.gen_units)]:
+        data[param] = {(z,h): v for z in columns for h, v in zip(hours, df[z].tolist())}
+    data['SimReserves'] = dict(zip(hours, d.df_reserves['Reserve'].tolist()))
+
+    return {None: data}
+
+
+######=================================================########
+######               Segment A.11                      ########
+######=================================================########
+
+####### Incremental .dat build
+# Bump when a block writer changes, so existing files are rewritten in full
+dat_version = 2
+
+def block_hash(deps):
+    h = hashlib.sha256(b'dat-v%d' % dat_version)
+    for dep in deps:
+        if isinstance(dep, pd.DataFrame):
+            h.update(json.dumps([str(c) for c in dep.columns]).encode())
+            h.update(pd.util.hash_pandas_object(dep, index=False).values.tobytes())
+        else:
+            h.update(json.dumps(dep, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+def build_dat_file(d, filename):
+    # Rewrites only the blocks whose data changed since the last build and copies the
+    # others from the existing file, using the hashes and offsets in <filename>.json.
+    # Returns the names of the regenerated blocks (empty when the file was up to date).
+    manifest_file = filename + '.json'
+    hashes = {name: block_hash(deps) for name, deps, writer in dat_blocks(d)}
+
+    old_blocks = {}
+    old_text = ''
+    if os.path.exists(filename) and os.path.exists(manifest_file):
+        with open(manifest_file) as m:
+            manifest = json.load(m)
+        with open(filename, newline='') as f:
+            old_text = f.read()
+        if manifest.get('size') == len(old_text):
+            old_blocks = manifest['blocks']
+
+    changed = [name for name in hashes if old_blocks.get(name, {}).get('hash') != hashes[name]]
+    if not changed:
+        return changed
+
+    text = io.StringIO()
+    blocks = {}
+    for name, deps, writer in dat_blocks(d):
+        start = text.tell()
+        if name in changed:
+            writer(text, d)
+        else:
+            text.write(old_text[old_blocks[name]['start']:old_blocks[name]['end']])
+        blocks[name] = {'hash': hashes[name], 'start': start, 'end': text.tell()}
+
+    with open(filename, 'w', newline='') as f:
+        f.write(text.getvalue())
+    with open(manifest_file, 'w') as m:
+        json.dump({'size': len(text.getvalue()), 'blocks': blocks}, m, indent=1)
+    return changed
+
+
+######=================================================########
+######               Segment A.12                      ########
+######=================================================########
+
+####### Scenario overlays
+# A scenario is a JSON file in scenarios/ whose entries are applied as deltas to the
+# base dataset when the scenario is loaded (all entries are optional):
+#   description - free text
+#   workdir     - directory for the .dat export and outputs, relative to the repository
+#   settings    - replacements for entries of the default settings
+#   gen_cost    - per fuel, a number replacing the unit cost or {"scale": s, "add": a}
+#                 for cost*s + a
+#   genparams   - per generator, replacements for columns of the generator table
+#   nodes       - nodes appended to the node lists, e.g. {"s_nodes": ["LSRE"]}
+#   columns     - per input table, a CSV whose columns are added to (or replace those
+#                 of) the table, row by row
+#   files       - per input table, a CSV that replaces the table
+# CSV paths are relative to scenarios/.
+
+def list_scenarios():
+    return sorted(fn[:-5] for fn in os.listdir(scenario_dir) if fn.endswith('.json'))
+
+def read_overlay(name):
+    with open(os.path.join(scenario_dir, name+'.json')) as f:
+        return json.load(f)
+
+def apply_overlay(overlay, tables):
+    tables = dict(tables)
+
+    for table, fn in overlay.get('files', {}).items():
+        tables[table] = read_table(table, os.path.join(scenario_dir, fn))
+
+    for table, fn in overlay.get('columns', {}).items():
+        extra = read_table(table, os.path.join(scenario_dir, fn))
+        if len(extra) != len(tables[table]):
+            raise ValueError('%s has %d rows, expected %d' % (fn, len(extra), len(tables[table])))
+        df = tables[table].copy()
+        for c in extra.columns:
+            df[c] = extra[c].values
+        tables[table] = df
+
+    if 'genparams' in overlay:
+        df = tables['genparams'].copy()
+        columns = {c.strip(): c for c in df.columns}
+        for unit, values in overlay['genparams'].items():
+            rows = df['name'] == unit
+            if not rows.any():
+                raise ValueError('unknown generator in overlay: %s' % unit)
+            for c, v in values.items():
+                df.loc[rows, columns[c]] = v
+        tables['genparams'] = df
+
+    return tables
+
+def load_scenario(name, **overrides):
+    # keyword arguments replace settings after the overlay (e.g. network='ptdf')
+    overlay = read_overlay(name)
+
+    s = dict(settings)
+    s.update(overlay.get('settings', {}))
+    s.update(overrides)
+
+    cost = dict(gen_cost)
+    for fuel, v in overlay.get('gen_cost', {}).items():
+        if isinstance(v, dict):
+            cost[fuel] = cost[fuel]*v.get('scale', 1) + v.get('add', 0)
+        else:
+            cost[fuel] = v
+
+    z_nodes = {z_list: list(z) for z_list, z in nodes.items()}
+    for z_list, z in overlay.get('nodes', {}).items():
+        z_nodes[z_list] = z_nodes[z_list] + z
+
+    tables = apply_overlay(overlay, read_inputs(s['yr']))
+    workdir = os.path.join(base_dir, overlay.get('workdir', os.path.join('runs', name)))
+    return setup_data(name, workdir, s, cost, tables, z_nodes)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Prepare the model data of a scenario')
+    parser.add_argument('scenario', nargs='?', default=scenario, choices=list_scenarios())
+    args = parser.parse_args()
+
+    d = load_scenario(args.scenario)
+    if write_dat:
+        dat_file = os.path.join(d.workdir, 'input', d.data_name+'.dat')
+        os.makedirs(os.path.dirname(dat_file), exist_ok=True)
+        changed = build_dat_file(d, dat_file)
+        if changed:
+            print ('Rewritten blocks:',', '.join(changed))
+        else:
+            print ('Up to date:',d.data_name)
+    print ('Complete:',args.scenario,d.data_name)
@@ -0,0 +1,358 @@
+import argparse
+import time
+from types import SimpleNamespace
+import numpy as np
+import scipy.sparse as sp
+import highspy
+from pyomo.opt import TerminationCondition
+
+from pownet_backends import condition_status, number, relative_gap
+
+
+######=================================================########
+######               Segment E.1                       ########
+######=================================================########
+
+####### Matrix form of the daily problem
+# The formulation of pownet_model.py (which stays the reference, see check_engines) assembled
+# once as a sparse matrix from the scenario data and passed to HiGHS directly. Between solves
+# only the row bounds (demand, reserves, ramping from the initial state, capacity and the line
+# limits of the PTDF formulation), the column bounds (hydro, solar, initial commitment) and the
+# derate factor coefficients change.
+
+res_types = ['gas','slack','geothermal','hydrogen']   ##units in Gas, Slack, Geothermal and Hydrogen
+big_m = 1e5                                           ##model.m
+
+
+def build_matrix(d, threads=1, time_limit=None, mip_gap=None):
+    col = {c.strip(): c for c in d.df_gen.columns}
+    gens = d.df_gen['name'].str.replace(' ','_').tolist()
+    G, H = len(gens), d.HorizonHours
+    par = {c: d.df_gen[col[c]].to_numpy(dtype=float) for c in ['maxcap','mincap','heat_rate','var_om','fix_om','st_cost','ramp','minup','mindn','gen_cost']}
+    maxcap = par['maxcap']
+    res = d.df_gen['typ'].isin(res_types).to_numpy()
+    angles = d.network == 'angles'
+    inf = np.inf
+
+    # columns: one block per variable, hour i of the horizon at position i-1 (on: at i, with hour 0)
+    blocks = [('mwh',G), ('switch',G), ('srsv',G), ('nrsv',G), ('hydro',len(d.h_nodes)), ('solar',len(d.s_nodes)),
+              ('vlt_angle',len(d.all_nodes) if angles else 0)]
+    C = {'on': np.arange(G*(H+1)).reshape(G,H+1)}
+    n_col = G*(H+1)
+    for name, n in blocks:
+        C[name] = n_col + np.arange(n*H).reshape(n,H)
+        n_col += n*H
+    mwh, on, sw, srsv, nrsv = C['mwh'], C['on'], C['switch'], C['srsv'], C['nrsv']
+
+    cost = np.zeros(n_col)
+    cost[on[:,1:]] = (maxcap*par['fix_om'])[:,None]
+    cost[sw] = (maxcap*par['st_cost'])[:,None]
+    cost[mwh] = np.where(res, par['heat_rate']*par['gen_cost'] + par['var_om'], 0)[:,None]
+    col_lo = np.zeros(n_col)
+    col_hi = np.full(n_col, inf)
+    col_hi[on] = 1
+    col_hi[sw] = 1
+    integer = np.zeros(n_col, dtype=bool)
+    integer[on] = True
+    integer[sw] = True
+    if angles:
+        col_lo[C['vlt_angle']] = -inf
+        col_lo[C['vlt_angle'][d.all_nodes.index(d.ref_node)]] = 0
+        col_hi[C['vlt_angle'][d.all_nodes.index(d.ref_node)]] = 0
+
+    # rows are added in blocks: terms are (columns, coefficients) broadcast against the block
+    entries, lo, hi = [], [], []
+    def add_rows(terms, row_lo, row_hi):
+        shape = np.broadcast_shapes(np.shape(row_lo), np.shape(row_hi))
+        start = sum(len(l) for l in lo)
+        rows = start + np.arange(int(np.prod(shape))).reshape(shape)
+        for c, v in terms:
+            r, c, v = np.broadcast_arrays(rows, c, v)
+            entries.append((r.ravel(), c.ravel(), v.ravel().astype(float)))
+        lo.append(np.broadcast_to(row_lo, shape).astype(float).ravel())
+        hi.append(np.broadcast_to(row_hi, shape).astype(float).ravel())
+        return rows
+    R = {}
+
+    # switching
+    add_rows([(sw, 1), (on[:,1:], -big_m)], -inf, np.zeros((G,H)))
+    add_rows([(sw, 1), (on[:,:-1], big_m)], -inf, np.full((G,H), big_m))
+    add_rows([(on[:,1:], 1), (on[:,:-1], -1), (sw, -1)], -inf, np.zeros((G,H)))
+
+    # minimum up and down time over the valid (j,i,k) triples
+    def triples(duration):
+        t = [(j,i,k) for j in range(G) for i in range(1,H+1) for k in range(i+1, min(i+int(duration[j])-1,H)+1)]
+        return np.array(t, dtype=int).reshape(-1,3).T
+    j, i, k = triples(par['minup'])
+    add_rows([(on[j,i], 1), (on[j,i-1], -1), (on[j,k], -1)], -inf, np.zeros(len(j)))
+    j, i, k = triples(par['mindn'])
+    add_rows([(on[j,i-1], 1), (on[j,i], -1), (on[j,k], 1)], -inf, np.ones(len(j)))
+
+    # ramping (hour 1 against ini_mwh, see set_initial)
+    ramp = par['ramp']
+    R['ramp'] = add_rows([(mwh[:,0], 1)], -ramp, ramp)
+    add_rows([(mwh[:,1:], 1), (mwh[:,:-1], -1)], np.broadcast_to(-ramp[:,None], (G,H-1)), ramp[:,None])
+
+    # capacity (on coefficients are scaled by the derate factor, see set_horizon)
+    R['maxcap'] = add_rows([(mwh, 1), (on[:,1:], -maxcap[:,None])], -inf, np.zeros((G,H)))
+    add_rows([(mwh, 1), (on[:,1:], -par['mincap'][:,None])], np.zeros((G,H)), inf)
+
+    # generation at each node: (columns, coefficient after losses)
+    thermo = {z: [(mwh[j], 1 - d.TransLoss) for j, node in enumerate(d.df_gen['node']) if node == z] for z in d.g_nodes}
+    hydro = {z: [(C['hydro'][n], 1 - d.TransLoss)] for n, z in enumerate(d.h_nodes)}
+    solar = {z: [(C['solar'][n], 1 - d.TransLoss)] for n, z in enumerate(d.s_nodes)}
+    def injection(z):
+        return thermo.get(z, []) + hydro.get(z, []) + solar.get(z, [])
+    def demand_of(z_nodes):
+        return np.array([z in z_nodes for z in d.d_nodes], dtype=float)
+
+    node_set = set(d.all_nodes)
+    paths = {k: v for k, v in d.path_index.items() if k[0] in node_set and k[1] in node_set}
+    R['demand'] = []   ##(rows, weights of the demand nodes) of the balances with demand on the right-hand side
+    if angles:
+        # nodal balances: generation - flow out over the adjacent lines = demand
+        theta = {z: C['vlt_angle'][n] for n, z in enumerate(d.all_nodes)}
+        for z_list, gen in [('td_nodes',{}), ('tn_nodes',{}), ('h_nodes',hydro), ('s_nodes',solar), ('gd_nodes',thermo), ('gn_nodes',thermo)]:
+            for z in getattr(d, z_list):
+                flow = [t for (s,k), (linemva, linesus) in paths.items() if s == z and linesus != 0
+                        for t in [(theta[z], -linesus), (theta[k], linesus)]]
+                rows = add_rows(gen.get(z, []) + flow, np.zeros(H), np.zeros(H))
+                if z_list in ['td_nodes','gd_nodes']:
+                    R['demand'].append((rows, demand_of([z])))
+    else:
+        # system balance: generation = demand
+        rows = add_rows([t for z in d.all_nodes for t in injection(z)], np.zeros(H), np.zeros(H))
+        R['demand'].append((rows, demand_of(d.d_nodes)))
+
+    # line limits (N-1 criterion)
+    R['ptdf'] = []   ##(rows, limit, shift factors of the demand nodes) of the PTDF line limits
+    if d.network != 'copperplate':
+        for (s,k), (linemva, linesus) in paths.items():
+            if linemva <= 0 or (angles and linesus == 0):
+                continue
+            limit = d.n1criterion * linemva
+            if angles:
+                add_rows([(theta[s], linesus), (theta[k], -linesus)], np.full(H, -limit), np.full(H, limit))
+            elif (s,k) in d.ptdf.index:
+                shift = d.ptdf.loc[(s,k)]
+                terms = [(c, a*shift[z]) for z in d.all_nodes if shift[z] != 0 for c, a in injection(z)]
+                if terms:
+                    rows = add_rows(terms, np.full(H, -limit), np.full(H, limit))
+                    R['ptdf'].append((rows, limit, shift[d.d_nodes].to_numpy(dtype=float)))
+
+    # reserves
+    R['reserve'] = add_rows([(srsv[res], 1), (nrsv[res], 1)], np.zeros(H), inf)
+    R['spin'] = add_rows([(srsv[res], 1)], np.zeros(H), inf)
+    R['spin_on'] = add_rows([(srsv, 1), (on[:,1:], -maxcap[:,None])], -inf, np.zeros((G,H)))
+    R['nonspin'] = add_rows([(nrsv, 1), (on[:,1:], maxcap[:,None])], -inf, np.zeros((G,H)))
+    R['zerosum'] = add_rows([(mwh, 1), (srsv, 1), (nrsv, 1)], -inf, np.zeros((G,H)))
+
+    r, c, v = (np.concatenate(x) for x in zip(*entries))
+    row_lo, row_hi = np.concatenate(lo), np.concatenate(hi)
+    A = sp.csc_matrix((v, (r, c)), shape=(len(row_lo), n_col))
+
+    m = SimpleNamespace(gens=gens, G=G, H=H, C=C, R=R, maxcap=maxcap, ramp=ramp, spin_margin=d.spin_margin,
+                        nodes={'hydro': d.h_nodes, 'solar': d.s_nodes, 'vlt_angle': d.all_nodes if angles else []},
+                        row_lo=row_lo, row_hi=row_hi, col_lo=col_lo, col_hi=col_hi, start=None)
+
+    # hourly series (row t is hour t+1 of the simulation)
+    m.demand = d.df_load[d.d_nodes].to_numpy(dtype=float)
+    m.hydro = d.df_hydro[d.h_nodes].to_numpy(dtype=float)
+    m.solar = d.df_solar[d.s_nodes].to_numpy(dtype=float)
+    m.deratef = d.df_gen_deratef[gens].to_numpy(dtype=float)
+    m.reserves = d.df_reserves['Reserve'].to_numpy(dtype=float)
+    m.der = np.ones((G,H))   ##derate factors in the matrix coefficients
+
+    lp = highspy.HighsLp()
+    lp.num_col_, lp.num_row_ = n_col, len(row_lo)
+    lp.col_cost_, lp.col_lower_, lp.col_upper_ = cost, col_lo, col_hi
+    lp.row_lower_, lp.row_upper_ = row_lo, row_hi
+    lp.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+    lp.a_matrix_.start_, lp.a_matrix_.index_, lp.a_matrix_.value_ = A.indptr, A.indices, A.data
+    lp.integrality_ = [highspy.HighsVarType.kInteger if x else highspy.HighsVarType.kContinuous for x in integer]
+    m.h = highspy.Highs()
+    m.h.setOptionValue('output_flag', False)
+    m.h.setOptionValue('threads', threads)
+    set_time_limit(m, time_limit)
+    if mip_gap is not None:
+        m.h.setOptionValue('mip_rel_gap', float(mip_gap))
+    m.h.passModel(lp)
+    set_initial(m, dict(zip(gens, d.df_gen['ini_on'])), dict(zip(gens, d.df_gen['ini_mwh'])))
+    return m
+
+
+######=================================================########
+######               Segment E.2                       ########
+######=================================================########
+
+####### Time limit of the next solves in seconds (None: no limit)
+def set_time_limit(m, time_limit):
+    m.h.setOptionValue('time_limit', np.inf if time_limit is None else float(time_limit))
+
+
+####### Initial state (commitment and output at hour 0)
+def set_initial(m, ini_on, ini_mwh):
+    on0 = np.array([ini_on[g] for g in m.gens], dtype=float)
+    mwh0 = np.array([ini_mwh[g] for g in m.gens], dtype=float)
+    m.col_lo[m.C['on'][:,0]] = on0
+    m.col_hi[m.C['on'][:,0]] = on0
+    m.row_lo[m.R['ramp']] = mwh0 - m.ramp
+    m.row_hi[m.R['ramp']] = mwh0 + m.ramp
+
+
+####### MIP start for the next solve: {var: {(generator, hour): value}} for on, switch, mwh, srsv
+####### and nrsv (the other columns are completed by HiGHS)
+def set_start(m, start):
+    pos = {g: n for n, g in enumerate(m.gens)}
+    index, value = [], []
+    for name, values in start.items():
+        for (g, i), x in values.items():
+            if i > 0:
+                index.append(m.C[name][pos[g], i if name == 'on' else i-1])
+                value.append(x)
+    m.start = (np.array(index, dtype=np.int32), np.array(value, dtype=float))
+
+
+####### Hourly data of the horizon; T[i-1] is the hour of the simulation for hour i of the horizon
+def set_horizon(m, T):
+    t = np.asarray(T) - 1
+    R, C = m.R, m.C
+
+    demand = m.demand[t]
+    for rows, weights in R['demand']:
+        m.row_lo[rows] = demand @ weights
+        m.row_hi[rows] = demand @ weights
+    for rows, limit, shift in R['ptdf']:
+        withdrawn = demand @ shift
+        m.row_lo[rows] = withdrawn - limit
+        m.row_hi[rows] = withdrawn + limit
+
+    m.row_lo[R['reserve']] = m.reserves[t]
+    m.row_lo[R['spin']] = m.spin_margin * m.reserves[t]
+
+    der = m.deratef[t].T
+    cap = m.maxcap[:,None] * der
+    m.row_hi[R['nonspin']] = cap
+    m.row_hi[R['zerosum']] = cap
+    for j, i in zip(*np.nonzero(der != m.der)):
+        m.h.changeCoeff(int(R['maxcap'][j,i]), int(C['on'][j,i+1]), -cap[j,i])
+        m.h.changeCoeff(int(R['spin_on'][j,i]), int(C['on'][j,i+1]), -cap[j,i])
+        m.h.changeCoeff(int(R['nonspin'][j,i]), int(C['on'][j,i+1]), cap[j,i])
+    m.der = der
+
+    m.col_hi[C['hydro']] = m.hydro[t].T
+    m.col_hi[C['solar']] = m.solar[t].T
+
+
+####### Termination of each HiGHS model status, as the Pyomo interface of HiGHS reports it, so that the metrics of
+####### both engines use the same names (statuses missing from the installed highspy are skipped)
+terminations = {getattr(highspy.HighsModelStatus, status): condition for status, condition in [
+    ('kNotset', TerminationCondition.unknown), ('kLoadError', TerminationCondition.error),
+    ('kModelError', TerminationCondition.error), ('kPresolveError', TerminationCondition.error),
+    ('kSolveError', TerminationCondition.error), ('kPostsolveError', TerminationCondition.error),
+    ('kModelEmpty', TerminationCondition.unknown), ('kOptimal', TerminationCondition.optimal),
+    ('kInfeasible', TerminationCondition.infeasible), ('kUnboundedOrInfeasible', TerminationCondition.infeasibleOrUnbounded),
+    ('kUnbounded', TerminationCondition.unbounded), ('kObjectiveBound', TerminationCondition.minFunctionValue),
+    ('kObjectiveTarget', TerminationCondition.minFunctionValue), ('kTimeLimit', TerminationCondition.maxTimeLimit),
+    ('kIterationLimit', TerminationCondition.maxIterations), ('kSolutionLimit', TerminationCondition.maxIterations),
+    ('kInterrupt', TerminationCondition.userInterrupt), ('kHighsInterrupt', TerminationCondition.userInterrupt),
+    ('kMemoryLimit', TerminationCondition.resourceInterrupt), ('kUnknown', TerminationCondition.unknown),
+] if hasattr(highspy.HighsModelStatus, status)}
+
+
+####### Solve; returns the status, objective and the values of each variable as an array (entity x hour of
+####### the horizon, hour 1 in column 0) with the generators in the order of df_gen and the nodes of m.nodes,
+####### the times of pushing the bounds (write), of HiGHS (solve) and of reading the solution (load), and the
+####### statistics of the solve as in Segment H.2 of pownet_backends.py. Stopped at a limit before finding a
+####### feasible solution, the status is no_solution and there are no values (None).
+def solve_matrix(m):
+    h = m.h
+    t = time.perf_counter()
+    h.changeRowsBounds(len(m.row_lo), np.arange(len(m.row_lo), dtype=np.int32), m.row_lo, m.row_hi)
+    h.changeColsBounds(len(m.col_lo), np.arange(len(m.col_lo), dtype=np.int32), m.col_lo, m.col_hi)
+    if m.start is not None:   ##after the bounds, whose changes discard a solution given to HiGHS
+        h.setSolution(len(m.start[0]), m.start[0], m.start[1])
+        m.start = None
+    times = {'write': time.perf_counter()-t}
+    t = time.perf_counter()
+    h.run()
+    times['solve'] = time.perf_counter()-t
+    t = time.perf_counter()
+    status = h.getModelStatus()
+    info = h.getInfo()
+    ##status as for the Pyomo solvers (see Segment H.2 of pownet_backends.py)
+    condition = terminations.get(status, TerminationCondition.unknown)
+    category = condition_status(condition)
+    values = None
+    if info.primal_solution_status == 2:
+        x = np.asarray(h.getSolution().col_value)
+        values = {name: x[m.C[name]] for name in ['mwh','switch','srsv','nrsv','hydro','solar','vlt_angle']}
+        values['on'] = x[m.C['on'][:,1:]]
+    elif category == 'limit':   ##no feasible solution found within the limit
+        category = 'no_solution'
+    else:
+        raise RuntimeError('HiGHS: %s' % h.modelStatusToString(status))
+    times['load'] = time.perf_counter()-t
+    ##HiGHS reports inf for a missing bound or gap and -1 for counts it does not have; those are None, as for Pyomo
+    objective, bound = number(info.objective_function_value), number(info.mip_dual_bound)
+    stats = {'termination': str(condition), 'objective': objective, 'bound': bound,
+             'gap': relative_gap(objective, bound),
+             'nodes': info.mip_node_count if info.mip_node_count >= 0 else None,
+             'iterations': info.simplex_iteration_count if info.simplex_iteration_count >= 0 else None}
+    return SimpleNamespace(optimal=status == highspy.HighsModelStatus.kOptimal, status=category,
+                           message=h.modelStatusToString(status), objective=info.objective_function_value, values=values,
+                           times=times, stats=stats)
+
+
+######=================================================########
+######               Segment E.3                       ########
+######=================================================########
+
+####### Cross-check against the Pyomo model: both engines solve each step from the same initial
+####### state (the one of the matrix solution) and their objectives are compared
+def check_engines(d, start, end, solver_name='highs', rel_tol=1e-4):
+    import pyomo.environ as pyo
+    from pownet_model import model
+    from pownet_datasetup import build_data
+    from pownet_solver import load_horizon
+    from pownet_backends import make_solver
+
+    m = build_matrix(d)
+    instance = model.create_instance(data=build_data(d))
+    opt = make_solver(solver_name)
+    K = range(1, d.HorizonHours+1)
+    mismatches = 0
+    for t0 in range((start-1)*24, end*24, d.commit_hours):
+        T = {i: min(t0+i,d.SimHours) for i in K}
+        set_horizon(m, [T[i] for i in K])
+        sol = solve_matrix(m)
+        load_horizon(instance, T, K)
+        opt.solve(instance)
+        reference = pyo.value(instance.SystemCost)
+        ok = abs(sol.objective - reference) <= rel_tol*max(abs(reference),1)
+        mismatches += not ok
+        print('hour %d: matrix %.4f, pyomo %.4f%s' % (t0+1, sol.objective, reference, '' if ok else '  MISMATCH'))
+
+        commit = min(d.commit_hours, end*24-t0)
+        ini_on = dict(zip(m.gens, np.round(sol.values['on'][:,commit-1]).astype(int).tolist()))
+        ini_mwh = dict(zip(m.gens, np.maximum(sol.values['mwh'][:,commit-1],0).tolist()))
+        set_initial(m, ini_on, ini_mwh)
+        for g in m.gens:
+            instance.ini_on[g] = ini_on[g]
+            instance.ini_mwh[g] = ini_mwh[g]
+    return mismatches
+
+
+if __name__ == '__main__':
+    from pownet_datasetup import list_scenarios, load_scenario
+    parser = argparse.ArgumentParser(description='Compare the matrix engine with the Pyomo model of a scenario')
+    parser.add_argument('scenario', choices=list_scenarios())
+    parser.add_argument('--start', type=int, default=1, help='first day')
+    parser.add_argument('--end', type=int, default=7, help='last day')
+    parser.add_argument('--solver', default='highs', help='solver of the Pyomo model')
+    parser.add_argument('--network', choices=['angles','ptdf','copperplate'], help='DC power flow formulation')
+    args = parser.parse_args()
+
+    overrides = {'network': args.network, 'copper_plate': False} if args.network else {}
+    mismatches = check_engines(load_scenario(args.scenario, **overrides), args.start, args.end, args.solver)
+    print('%d mismatched objective(s)' % mismatches)
@@ -4,12 +4,6 @@ from pyomo.environ import *
 from pyomo.opt import SolverFactory
 import itertools
 
-gd_nodes = ["CORN1", "CORN2"] ##Dispatchables with demand
-gn_nodes = [] ##Dispatchables without demand
-
-g_nodes = gd_nodes + gn_nodes 
-print ('Gen_Nodes:',len(g_nodes))
-
 
 model = AbstractModel()
 
@@ -18,11 +12,8 @@ model = AbstractModel()
 ######               Segment B.1                       ########
 ######=================================================########
 
-# string indentifiers for the set of generators (in the order of g_nodes list)
-model.GD1Gens =  Set()
-model.GD2Gens =  Set()
-
-model.Generators = model.GD1Gens | model.GD2Gens
+# string indentifiers for the set of generators (each is assigned to a generator node by param node)
+model.Generators = Set()
                    
 # Generators by fuel-type
 model.Gas = Set()
@@ -48,6 +39,7 @@ model.s_nodes = Set()
 model.d_nodes = Set()
 model.gd_nodes = Set()
 model.gn_nodes = Set()
+model.g_nodes = model.gd_nodes | model.gn_nodes
 model.td_nodes = Set()
 model.tn_nodes = Set()
 
@@ -64,6 +56,16 @@ model.typ = Param(model.Generators,within=Any)
 #Node name
 model.node = Param(model.Generators,within=Any)
 
+#Generators at each generator node
+def NodeGens_init(model):
+    gens = {z: [] for z in model.g_nodes}
+    for j in model.Generators:
+        if model.node[j] not in gens:
+            raise ValueError('generator %s is at node %s, which is not in gd_nodes or gn_nodes' % (j, model.node[j]))
+        gens[model.node[j]].append(j)
+    return gens
+model.NodeGens = Set(model.g_nodes, within=model.Generators, initialize=NodeGens_init)
+
 #Max capacity
 model.maxcap = Param(model.Generators,within=Any)
 
@@ -100,8 +102,33 @@ model.gen_cost = Param(model.Generators,within=NonNegativeReals)
 ######=================================================########
 
 ######==== Transmission line parameters =======#######
-model.linemva = Param(model.sources, model.sinks)
-model.linesus = Param(model.sources, model.sinks)
+model.linemva = Param(model.sources, model.sinks, default=0)
+model.linesus = Param(model.sources, model.sinks, default=0)
+
+### Sparse line set (pairs with a rating or susceptance) and per-node adjacency (neighbours with susceptance)
+def Lines_init(model):
+    pairs = [k for k, v in model.linesus.sparse_items() if v != 0]
+    seen = set(pairs)
+    return pairs + [k for k, v in model.linemva.sparse_items() if v > 0 and k not in seen]
+model.lines = Set(dimen=2, initialize=Lines_init)
+
+def Adjacent_init(model):
+    adj = {z: [] for z in model.nodes}
+    for s, k in model.lines:
+        if model.linesus[s,k] != 0:
+            adj[s].append(k)
+    return adj
+model.adjacent = Set(model.nodes, within=model.nodes, initialize=Adjacent_init)
+
+### DC power flow formulation: 'angles' (voltage angle at each node), 'ptdf' (line flows from shift factors)
+### or 'copperplate' (single bus, no line limits; chosen by pownet_datasetup.py when no limit can bind)
+model.network = Param(within=Any, default='angles')
+
+### Reference node (zero voltage angle; withdraws the injections behind the shift factors)
+model.ref_node = Param(within=model.nodes)
+
+### Shift factor of each line for an injection at each node (from pownet_datasetup.py, 'ptdf' only)
+model.ptdf = Param(model.lines, model.nodes, default=0)
 
 ### Transmission Loss as a %discount on production
 model.TransLoss = Param(within=NonNegativeReals)
@@ -247,21 +274,23 @@ model.Switch4Constraint = Constraint(model.Generators,model.hh_periods,rule = Sw
 
 
 ######========== Up/Down Time Constraint =========#############
+##Valid (j,i,k) triples: a start-up (shut-down) of unit j in hour i>0 binds hours i < k <= i+minup-1 (mindn-1)
+def UpDownTriples(model,duration):
+    return [(j,i,k) for j in model.Generators for i in model.hh_periods
+            for k in range(i+1,min(i+int(duration[j])-1,value(model.HorizonHours))+1)]
+
+model.MinUpSet = Set(dimen=3,initialize=lambda model: UpDownTriples(model,model.minup))
+model.MinDownSet = Set(dimen=3,initialize=lambda model: UpDownTriples(model,model.mindn))
+
 ##Min Up time
 def MinUp(model,j,i,k):
-    if i > 0 and k > i and k <= min(i+model.minup[j]-1,model.HorizonHours):
-        return model.on[j,i] - model.on[j,i-1] <= model.on[j,k]
-    else: 
-        return Constraint.Skip
-model.MinimumUp = Constraint(model.Generators,model.HH_periods,model.HH_periods,rule=MinUp)
+    return model.on[j,i] - model.on[j,i-1] <= model.on[j,k]
+model.MinimumUp = Constraint(model.MinUpSet,rule=MinUp)
 
 ##Min Down time
 def MinDown(model,j,i,k):
-   if i > 0 and k > i and k <= min(i+model.mindn[j]-1,model.HorizonHours):
-       return model.on[j,i-1] - model.on[j,i] <= 1 - model.on[j,k]
-   else:
-       return Constraint.Skip
-model.MinimumDown = Constraint(model.Generators,model.HH_periods,model.HH_periods,rule=MinDown)
+    return model.on[j,i-1] - model.on[j,i] <= 1 - model.on[j,k]
+model.MinimumDown = Constraint(model.MinDownSet,rule=MinDown)
 
 ######==========Ramp Rate Constraints =========#############
 def Ramp1(model,j,i):
@@ -314,17 +343,47 @@ model.SolarConstraint= Constraint(model.s_nodes,model.hh_periods,rule=SolarC)
 ######=================================================########
 
 #########======================== Power balance in sub-station nodes (with/without demand) ====================#######
+##Net flow out of node z over its adjacent lines
+def Impedance(model,z,i):
+    return sum(model.linesus[z,k] * (model.vlt_angle[z,i] - model.vlt_angle[k,i]) for k in model.adjacent[z])
+
+##Net injection at node z (generation after transmission losses, less demand)
+def Injection(model,z,i):
+    gen = 0
+    if z in model.g_nodes:
+        gen += sum(model.mwh[j,i] for j in model.NodeGens[z])
+    if z in model.h_nodes:
+        gen += model.hydro[z,i]
+    if z in model.s_nodes:
+        gen += model.solar[z,i]
+    injection = (1 - model.TransLoss) * gen
+    if z in model.d_nodes:
+        injection -= model.HorizonDemand[z,i]
+    return injection
+
+##Flow on line (s,k)
+def Flow(model,s,k,i):
+    if value(model.network) == 'ptdf':
+        return sum(model.ptdf[s,k,z] * Injection(model,z,i) for z in model.nodes if model.ptdf[s,k,z] != 0)
+    return model.linesus[s,k] * (model.vlt_angle[s,i] - model.vlt_angle[k,i])
+
+##The nodal balances below belong to the 'angles' formulation; the others use the system balance of Segment B.11.4
+
 ###With demand
 def TDnodes_Balance(model,z,i):
+    if value(model.network) != 'angles':
+        return Constraint.Skip
     demand = model.HorizonDemand[z,i]
-    impedance = sum(model.linesus[z,k] * (model.vlt_angle[z,i] - model.vlt_angle[k,i]) for k in model.sinks)   
+    impedance = Impedance(model,z,i)
     return - demand == impedance
 model.TDnodes_BalConstraint= Constraint(model.td_nodes,model.hh_periods,rule= TDnodes_Balance)
 
 ###Without demand
 def TNnodes_Balance(model,z,i):
+    if value(model.network) != 'angles':
+        return Constraint.Skip
     #demand = model.HorizonDemand[z,i]
-    impedance = sum(model.linesus[z,k] * (model.vlt_angle[z,i] - model.vlt_angle[k,i]) for k in model.sinks)   
+    impedance = Impedance(model,z,i)
     return 0 == impedance
 model.TNnodes_BalConstraint= Constraint(model.tn_nodes,model.hh_periods,rule= TNnodes_Balance)
 
@@ -337,17 +396,21 @@ model.TNnodes_BalConstraint= Constraint(model.tn_nodes,model.hh_periods,rule= TN
 
 ###Hydropower Plants
 def HPnodes_Balance(model,z,i):
+    if value(model.network) != 'angles':
+        return Constraint.Skip
     dis_hydro = model.hydro[z,i]
     #demand = model.HorizonDemand[z,i]
-    impedance = sum(model.linesus[z,k] * (model.vlt_angle[z,i] - model.vlt_angle[k,i]) for k in model.sinks)
+    impedance = Impedance(model,z,i)
     return (1 - model.TransLoss) * dis_hydro == impedance ##- demand
 model.HPnodes_BalConstraint= Constraint(model.h_nodes,model.hh_periods,rule= HPnodes_Balance)
 
 
 ######Solar Plants
 def Solarnodes_Balance(model,z,i):
+    if value(model.network) != 'angles':
+        return Constraint.Skip
     dis_solar = model.solar[z,i]
-    impedance = sum(model.linesus[z,k] * (model.vlt_angle[z,i] - model.vlt_angle[k,i]) for k in model.sinks)
+    impedance = Impedance(model,z,i)
     return (1 - model.TransLoss) * dis_solar == impedance ##- demand
 model.Solarnodes_BalConstraint= Constraint(model.s_nodes,model.hh_periods,rule= Solarnodes_Balance)
 
@@ -356,22 +419,37 @@ model.Solarnodes_BalConstraint= Constraint(model.s_nodes,model.hh_periods,rule=
 ######               Segment B.11.3                    ########
 ######=================================================########
 
-##########============ Power balance in nodes of dispatchable resources with demand ==============############
-def GD1_Balance(model,i):
-    gd = 1
-    thermo = sum(model.mwh[j,i] for j in model.GD1Gens)
-    demand = model.HorizonDemand[gd_nodes[gd-1],i]
-    impedance = sum(model.linesus[gd_nodes[gd-1],k] * (model.vlt_angle[gd_nodes[gd-1],i] - model.vlt_angle[k,i]) for k in model.sinks)   
+##########============ Power balance in nodes of dispatchable resources (with/without demand) ==============############
+###With demand
+def GDnodes_Balance(model,z,i):
+    if value(model.network) != 'angles':
+        return Constraint.Skip
+    thermo = sum(model.mwh[j,i] for j in model.NodeGens[z])
+    demand = model.HorizonDemand[z,i]
+    impedance = Impedance(model,z,i)
     return (1 - model.TransLoss) * thermo - demand == impedance
-model.GD1_BalConstraint= Constraint(model.hh_periods,rule= GD1_Balance)
+model.GDnodes_BalConstraint= Constraint(model.gd_nodes,model.hh_periods,rule= GDnodes_Balance)
 
-def GD2_Balance(model,i):
-    gd = 2
-    thermo = sum(model.mwh[j,i] for j in model.GD2Gens)
-    demand = model.HorizonDemand[gd_nodes[gd-1],i]
-    impedance = sum(model.linesus[gd_nodes[gd-1],k] * (model.vlt_angle[gd_nodes[gd-1],i] - model.vlt_angle[k,i]) for k in model.sinks)   
-    return (1 - model.TransLoss) * thermo - demand == impedance
-model.GD2_BalConstraint= Constraint(model.hh_periods,rule= GD2_Balance)
+###Without demand
+def GNnodes_Balance(model,z,i):
+    if value(model.network) != 'angles':
+        return Constraint.Skip
+    thermo = sum(model.mwh[j,i] for j in model.NodeGens[z])
+    impedance = Impedance(model,z,i)
+    return (1 - model.TransLoss) * thermo == impedance
+model.GNnodes_BalConstraint= Constraint(model.gn_nodes,model.hh_periods,rule= GNnodes_Balance)
+
+
+######=================================================########
+######               Segment B.11.4                    ########
+######=================================================########
+
+##########============ Power balance of the whole system (PTDF and copper plate formulations) ==============############
+def System_Balance(model,i):
+    if value(model.network) == 'angles':
+        return Constraint.Skip
+    return sum(Injection(model,z,i) for z in model.nodes) == 0
+model.System_BalConstraint= Constraint(model.hh_periods,rule= System_Balance)
 
 
 ######=================================================########
@@ -382,24 +460,32 @@ model.GD2_BalConstraint= Constraint(model.hh_periods,rule= GD2_Balance)
 
 ####=== Reference Node =====#####
 def ref_node(model,i):
-    return model.vlt_angle['CORN2',i] == 0
+    if value(model.network) != 'angles':
+        return Constraint.Skip
+    return model.vlt_angle[model.ref_node,i] == 0
 model.Ref_NodeConstraint= Constraint(model.hh_periods,rule= ref_node)
 
 
 ######========== Transmission Capacity Constraints (N-1 Criterion) =========#############
 def MaxLine(model,s,k,i):
-    if model.linemva[s,k] > 0:
-        return (model.n1criterion) * model.linemva[s,k] >= model.linesus[s,k] * (model.vlt_angle[s,i] - model.vlt_angle[k,i])
+    if value(model.network) == 'copperplate':
+        return Constraint.Skip
+    flow = Flow(model,s,k,i)
+    if model.linemva[s,k] > 0 and not is_constant(flow):
+        return (model.n1criterion) * model.linemva[s,k] >= flow
     else:
         return Constraint.Skip
-model.MaxLineConstraint= Constraint(model.sources,model.sinks,model.hh_periods,rule=MaxLine)
+model.MaxLineConstraint= Constraint(model.lines,model.hh_periods,rule=MaxLine)
 
 def MinLine(model,s,k,i):
-    if model.linemva[s,k] > 0:
-        return (-model.n1criterion) * model.linemva[s,k] <= model.linesus[s,k] * (model.vlt_angle[s,i] - model.vlt_angle[k,i])
+    if value(model.network) == 'copperplate':
+        return Constraint.Skip
+    flow = Flow(model,s,k,i)
+    if model.linemva[s,k] > 0 and not is_constant(flow):
+        return (-model.n1criterion) * model.linemva[s,k] <= flow
     else:
         return Constraint.Skip
-model.MinLineConstraint= Constraint(model.sources,model.sinks,model.hh_periods,rule=MinLine)
+model.MinLineConstraint= Constraint(model.lines,model.hh_periods,rule=MinLine)
 
 
 
@@ -0,0 +1,231 @@
+import argparse
+import os
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
+
+
+######=================================================########
+######               Segment F.1                       ########
+######=================================================########
+
+####### Result files of a run
+# The solver keeps each variable as a day x hour x entity array (see run_scenario), written as
+# - csv: one long-format table per variable, <prefix>_<var>.csv
+# - npz: one compressed bundle of the arrays, <prefix>.npz, with the binary on/switch packed as bits
+# - parquet: one typed table per variable, <prefix>_<var>.parquet, with a categorical entity column (needs pyarrow)
+# where <prefix> is <output_dir>/out_Cornell_R<run_no>_<yr>. The files are written chunk_days at a time, and with
+# stream=True the arrays themselves are disk-backed (<prefix>_<var>.spill.npy) while the run is in progress,
+# so the memory of a run does not grow with its length.
+
+result_vars = ['mwh','hydro','solar','vlt_angle','on','switch','srsv','nrsv']
+unit_vars = ['mwh','on','switch','srsv','nrsv']   ##indexed by generator, the others by node
+binary_vars = ['on','switch']
+output_formats = ['csv','npz','parquet']
+
+
+def result_prefix(output_dir, run_no, yr):
+    return os.path.join(output_dir, 'out_Cornell_R'+str(run_no)+'_'+str(yr))
+
+
+####### Result arrays (day x hour x entity) of a run: in memory, or spilled to disk with stream=True
+####### (reopened as they are when resuming)
+def open_results(prefix, entities, days, stream=False, resume=False):
+    results = {}
+    for a in entities:
+        shape = (days, 24, len(entities[a]))
+        if not stream:
+            results[a] = np.zeros(shape)
+        elif resume:
+            results[a] = np.load(prefix+'_'+a+'.spill.npy', mmap_mode='r+')
+        else:
+            results[a] = np.lib.format.open_memmap(prefix+'_'+a+'.spill.npy', mode='w+', dtype=float, shape=shape)
+    return results
+
+
+def close_results(prefix, results):
+    for a, values in results.items():
+        if isinstance(values, np.memmap):
+            os.remove(prefix+'_'+a+'.spill.npy')
+
+
+####### Long format of a result array (day x hour x entity): the hours of each entity together, day by day
+def result_frame(values, entities, column, first_hour):
+    days, hours, n = values.shape
+    time = first_hour + 1 + np.arange(days*hours).reshape(days,1,hours)
+    return pd.DataFrame({column: np.tile(np.repeat(entities,hours), days),
+                         'Time': np.broadcast_to(time, (days,n,hours)).ravel(),
+                         'Value': values.transpose(0,2,1).ravel()})
+
+
+def write_results(prefix, results, entities, first_hour, formats=('csv',), chunk_days=30):
+    for fmt in formats:
+        if fmt == 'npz':
+            bundle = {'first_hour': np.array(first_hour)}
+            for a, values in results.items():
+                bundle[a+'_entities'] = np.array(entities[a], dtype=str)
+                bundle[a+'_shape'] = np.array(values.shape)
+                if a in binary_vars: ##a day is 24 bits per entity, so chunks of days pack to whole bytes
+                    bundle[a] = np.concatenate([np.packbits(np.round(values[c:c+chunk_days]).astype(bool), axis=None)
+                                                for c in range(0, len(values), chunk_days)])
+                else:
+                    bundle[a] = values ##written in buffered pieces, also from a disk-backed array
+            np.savez_compressed(prefix+'.npz', **bundle)
+            continue
+
+        for a in result_vars:
+            column = 'Generator' if a in unit_vars else 'Node'
+            if fmt == 'csv' and a not in results:
+                pd.DataFrame([], columns=(column,'Time','Value')).to_csv(prefix+'_'+a+'.csv') ##e.g. no angles without the angle formulation
+            if a not in results:
+                continue
+            values = results[a]
+            writer, rows = None, 0
+            for c in range(0, len(values), chunk_days):
+                df = result_frame(values[c:c+chunk_days], entities[a], column, first_hour+24*c)
+                df.index += rows
+                rows += len(df)
+                if fmt == 'csv':
+                    df.to_csv(prefix+'_'+a+'.csv', mode='a' if c else 'w', header=not c)
+                elif fmt == 'parquet':
+                    import pyarrow as pa
+                    import pyarrow.parquet as pq
+                    df[column] = pd.Categorical(df[column], categories=entities[a])
+                    df['Time'] = df['Time'].astype('int32')
+                    if a in binary_vars:
+                        df['Value'] = df['Value'].round().astype('int8')
+                    table = pa.Table.from_pandas(df, preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(prefix+'_'+a+'.parquet', table.schema)
+                    writer.write_table(table)
+            if writer is not None:
+                writer.close()
+
+
+######=================================================########
+######               Segment F.2                       ########
+######=================================================########
+
+####### Read an .npz bundle back: the arrays and entities of each variable
+def read_bundle(filename):
+    with np.load(filename, allow_pickle=False) as f:
+        b = SimpleNamespace(first_hour=int(f['first_hour']), values={}, entities={})
+        for a in result_vars:
+            if a not in f:
+                continue
+            shape = tuple(f[a+'_shape'])
+            if a in binary_vars:
+                b.values[a] = np.unpackbits(f[a], count=int(np.prod(shape))).reshape(shape).astype(float)
+            else:
+                b.values[a] = f[a]
+            b.entities[a] = f[a+'_entities'].tolist()
+    return b
+
+
+####### Long-format tables of a bundle, as in the .csv files (entity column categorical)
+def bundle_frames(b):
+    frames = {}
+    for a, values in b.values.items():
+        column = 'Generator' if a in unit_vars else 'Node'
+        frames[a] = result_frame(values, b.entities[a], column, b.first_hour)
+        frames[a][column] = frames[a][column].astype('category')
+    return frames
+
+
+######=================================================########
+######               Segment F.3                       ########
+######=================================================########
+
+####### Checkpoint of a run in progress: the result arrays so far (disk-backed ones are flushed instead),
+####### the hour and initial state (in the order of the result entities) of the next step, and a description
+####### of the run, which must match for the checkpoint to be resumed
+def write_checkpoint(filename, run, next_hour, results, ini_on, ini_mwh):
+    in_memory = {}
+    for a, values in results.items():
+        if isinstance(values, np.memmap):
+            values.flush()
+        else:
+            in_memory['result_'+a] = values
+    # written to a private temporary file first so an interrupted write never replaces the last checkpoint
+    tmp = filename + '.%d.tmp' % os.getpid()
+    with open(tmp, 'wb') as f:
+        np.savez(f, run=np.array(run), next_hour=np.array(next_hour), ini_on=np.array(ini_on), ini_mwh=np.array(ini_mwh),
+                 **in_memory)
+    os.replace(tmp, filename)
+
+
+def read_checkpoint(filename, run):
+    with np.load(filename, allow_pickle=False) as f:
+        if str(f['run']) != run:
+            raise ValueError('%s is the checkpoint of another run (%s), not of %s' % (filename, f['run'], run))
+        return SimpleNamespace(next_hour=int(f['next_hour']), ini_on=f['ini_on'].tolist(), ini_mwh=f['ini_mwh'].tolist(),
+                               results={k[len('result_'):]: f[k] for k in f.files if k.startswith('result_')})
+
+
+######=================================================########
+######               Segment F.4                       ########
+######=================================================########
+
+####### Solver statistics and timing of a run (<prefix>_metrics.jsonl, one record per step and line): the status of
+####### the solve (optimal, limit, feasible, no_solution or lp_path, see pownet_backends.py), its termination, objective,
+####### best bound, relative gap, nodes and iterations, its flags (limit, feasible, gap above flag_gap), and in seconds
+#   horizon    - initial state, Horizon* params and MIP start loaded into the model
+#   lp_path    - LP fast path (relaxed solve and rounding)
+#   write      - Pyomo writing or updating the model and reading the results back (matrix engine: pushing the
+#                bounds); not separated from solve when the Pyomo interface does not report the solver time
+#   solve      - the solver itself
+#   load       - solution loaded into the model
+#   extract    - values of the result variables read and stored in the result arrays
+#   handoff    - end state and MIP start passed on to the next step
+#   checkpoint - checkpoint written after the step
+# In parallel mode the times are summed over the rounds that solved the step, as are those of the solve again without
+# the time limit of a step with no solution within it.
+phases = ['horizon','lp_path','write','solve','load','extract','handoff','checkpoint']
+
+
+stat_names = ['status','termination','objective','bound','gap','nodes','iterations']
+
+
+def step_record(t0, times, stats, flags):
+    record = {'day': t0//24+1, 'hour': t0+1}
+    record.update({name: stats[name] for name in stat_names})
+    record['flags'] = flags
+    record.update({name: round(times[name], 6) for name in phases if name in times})
+    record['total'] = round(sum(times.values()), 6)
+    return record
+
+
+def print_metrics(records, output_time):
+    total = sum(r['total'] for r in records)
+    print('%-12s %10s %7s %10s %10s %6s' % ('phase', 'total s', 'share', 'mean s', 'max s', 'day'))
+    for name in phases:
+        times = [(r[name], r['day']) for r in records if name in r]
+        if times:
+            longest = max(times)
+            print('%-12s %10.2f %6.1f%% %10.4f %10.4f %6d' % (name, sum(t for t, day in times),
+                  100*sum(t for t, day in times)/max(total,1e-9), sum(t for t, day in times)/len(times), *longest))
+    print('%-12s %10.2f   (%d steps)' % ('steps', total, len(records)))
+    print('%-12s %10.2f' % ('output', output_time))
+
+    statuses = {}
+    for r in records:
+        statuses[r['status']] = statuses.get(r['status'], 0) + 1
+    print('Solves: ' + ', '.join('%d %s' % (count, status) for status, count in sorted(statuses.items())))
+    flagged = [r for r in records if r['flags']]
+    if flagged:
+        print('Flagged days: ' + ', '.join('%d (%s)' % (r['day'], ', '.join(r['flags'])) for r in flagged))
+    ##the steps that take most of the solver time
+    solve_total = sum(r.get('solve', 0) for r in records)
+    slowest = sorted(records, key=lambda r: -r.get('solve', 0))[:5]
+    print('Slowest solves: ' + ', '.join('day %d %.2f s (%.0f%%)' % (r['day'], r.get('solve', 0), 100*r.get('solve', 0)/max(solve_total,1e-9))
+                                         for r in slowest))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Export the results of an .npz bundle to other formats')
+    parser.add_argument('bundle', help='out_Cornell_R<run_no>_<yr>.npz written by pownet_solver.py')
+    parser.add_argument('--format', nargs='+', default=['csv'], choices=['csv','parquet'], help='formats to write next to the bundle')
+    args = parser.parse_args()
+
+    b = read_bundle(args.bundle)
+    write_results(os.path.splitext(args.bundle)[0], b.values, b.entities, b.first_hour, args.format)
@@ -0,0 +1,84 @@
+import argparse
+import contextlib
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from pownet_datasetup import list_scenarios, load_scenario
+import pownet_solver
+
+
+######=================================================########
+######               Segment G.1                       ########
+######=================================================########
+
+####### Several scenarios at once
+# Each scenario runs in its own process of a pool, with `threads` solver threads per solve, so
+# processes x threads is the number of cores in use. Its outputs go to the output/ directory of its
+# scenario directory (or <output_root>/<scenario>), together with the log of the run (run.log).
+
+def run_job(name, output_root, overrides, options):
+    t = time.time()
+    output_dir = os.path.join(output_root, name) if output_root else None
+    try:
+        d = load_scenario(name, **overrides)
+        if output_dir is None:
+            output_dir = os.path.join(d.workdir, 'output')
+        os.makedirs(output_dir, exist_ok=True)
+        with open(os.path.join(output_dir, 'run.log'), 'w') as log, contextlib.redirect_stdout(log):
+            try:
+                pownet_solver.run_scenario(d, output_dir=output_dir, **options)
+            except Exception:
+                traceback.print_exc(file=log)
+                raise
+        status = 'done'
+    except Exception as e:
+        status = 'failed (%s: %s)' % (type(e).__name__, str(e).split('\n')[0])
+    return name, status, time.time()-t, output_dir
+
+
+def run_batch(names, processes, output_root=None, overrides=None, **options):
+    overrides = overrides or {}
+    print('%d scenario(s) on %d process(es)' % (len(names), processes))
+    failed = []
+    with ProcessPoolExecutor(processes) as pool:
+        jobs = [pool.submit(run_job, name, output_root, overrides, options) for name in names]
+        for job in as_completed(jobs):
+            name, status, elapsed, output_dir = job.result()
+            print('%-16s %8.1f s  %s  %s' % (name, elapsed, status, output_dir))
+            if status != 'done':
+                failed.append(name)
+    return failed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run several scenarios concurrently')
+    parser.add_argument('scenarios', nargs='*', help='scenarios to run, of %s (default: all)' % ', '.join(list_scenarios()))
+    parser.add_argument('--processes', type=int, help='scenarios run at once (default: cores / threads)')
+    parser.add_argument('--threads', type=int, default=1, help='solver threads of each solve')
+    parser.add_argument('--time-limit', type=float, default=pownet_solver.time_limit, help='seconds per solve')
+    parser.add_argument('--mip-gap', type=float, default=pownet_solver.mip_gap, help='relative MIP gap of each solve')
+    parser.add_argument('--start', type=int, default=pownet_solver.start, help='first day of simulation')
+    parser.add_argument('--end', type=int, default=pownet_solver.end, help='last day of simulation')
+    parser.add_argument('--solver', default=pownet_solver.solver_name, help='solver used for the daily problems')
+    parser.add_argument('--engine', choices=['pyomo','matrix'], default=pownet_solver.engine,
+                        help='build the daily problem with Pyomo or as a sparse matrix solved by HiGHS directly')
+    parser.add_argument('--network', choices=['angles','ptdf','copperplate'], help='DC power flow formulation, used as given')
+    parser.add_argument('--output-format', nargs='+', choices=pownet_solver.output_formats,
+                        default=pownet_solver.output_format, help='result files to write')
+    parser.add_argument('--output-root', help='write the outputs to <output-root>/<scenario> instead of the scenario directories')
+    args = parser.parse_args()
+
+    names = args.scenarios or list_scenarios()
+    unknown = [name for name in names if name not in list_scenarios()]
+    if unknown:
+        parser.error('unknown scenario(s): ' + ', '.join(unknown))
+    processes = args.processes or max(1, (os.cpu_count() or 1) // args.threads)
+    overrides = {'network': args.network, 'copper_plate': False} if args.network else {}
+    failed = run_batch(names, min(processes, len(names)), args.output_root, overrides,
+                       start=args.start, end=args.end, solver_name=args.solver, engine=args.engine,
+                       output_format=args.output_format, threads=args.threads,
+                       time_limit=args.time_limit, mip_gap=args.mip_gap)
+    if failed:
+        raise SystemExit('failed: ' + ', '.join(failed))
@@ -0,0 +1,597 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+import numpy as np
+from datetime import datetime
+import pyomo.environ as pyo
+
+
+######=================================================########
+######               Segment C.1                       ########
+######=================================================########
+
+###scenario, start and end of simulation
+scenario = 'BaU' ##scenario overlay in scenarios/ (see Segment A.12 of pownet_datasetup.py)
+run_no = 1
+
+start = 1 ##first day of simulation (1 to 365)
+end  = 365 ##last day of simulation (1 to 365)
+##the step (commit_hours) and look-ahead (lookahead_hours) of the rolling horizon are scenario settings
+
+use_dat = False ##True: read <workdir>/input/pownet_data_cornell_<yr>.dat; False: build the instance in memory
+
+solver_name = 'auto' ##solver of the daily problems: gurobi, highs, scip, cbc, glpk or 'auto' (see pownet_backends.py)
+threads = 1 ##solver threads of each solve
+time_limit = None ##seconds per solve (None: no limit)
+mip_gap = None ##relative MIP gap of each solve (None: the solver default)
+flag_gap = 0.01 ##steps left with a larger relative MIP gap are flagged (as are those stopped at a limit)
+persistent = False ##True: keep the model resident in the solver and push only changed parameters each day
+engine = 'pyomo' ##'pyomo': Pyomo model of pownet_model.py; 'matrix': sparse matrix sent to HiGHS directly (pownet_matrix.py)
+workers = 1 ##processes solving the steps in parallel from speculative initial states (1: sequential)
+checkpoint_steps = 10 ##steps between checkpoints of the run in progress (0: none)
+resume = False ##True: continue from the checkpoint in the output directory
+stream_results = False ##True: keep the results in disk-backed arrays in the output directory instead of memory
+output_format = ['csv'] ##result files, any of 'csv', 'npz' and 'parquet' (see pownet_output.py)
+warm_start = None ##MIP start of each solve: None; 'day': the schedule of the previous day; 'week': the same day of the previous week
+
+
+######=================================================########
+######               Segment C.2                       ########
+######=================================================########
+##import pownet model and scenario data
+from pownet_model import model
+from pownet_backends import load_result, make_solver, number, relative_gap, solve_statistics, solver_time
+from pownet_datasetup import build_data, build_dat_file, list_scenarios, load_scenario
+from pownet_output import (close_results, open_results, output_formats, print_metrics, read_checkpoint, result_prefix,
+                           step_record, write_checkpoint, write_results)
+
+
+###LP fast path: solve with the binaries relaxed (a lower bound) and round the commitment up in
+###place, offering the non-spinning reserve of the units turned on as spinning reserve. Without
+###minimum output or up/down times (d.lp_candidate, see pownet_datasetup.py) the rounded schedule
+###is feasible; it is kept when its cost is within lp_gap of the bound, i.e. as good as the MIP
+###within the same gap. Returns None (solve the MIP) otherwise.
+def solve_relaxed(instance, opt, K, lp_gap):
+    binaries = [instance.on, instance.switch]
+    for v in binaries:
+        for index in v:
+            v[index].domain = pyo.UnitInterval
+    relaxed = opt.solve(instance, load_solutions=False)
+    optimal = relaxed.solver.termination_condition == pyo.TerminationCondition.optimal
+    if optimal:
+        instance.solutions.load_from(relaxed)
+    for v in binaries:
+        for index in v:
+            v[index].domain = pyo.Binary
+    if not optimal:
+        return None
+    bound = pyo.value(instance.SystemCost)
+
+    for j in instance.Generators:
+        on_prev = round(pyo.value(instance.ini_on[j]))
+        instance.on[j,0].value = on_prev
+        instance.switch[j,0].value = 0
+        for i in K:
+            on = 1 if instance.on[j,i].value > 1e-6 else 0
+            if on:
+                instance.srsv[j,i].value += instance.nrsv[j,i].value
+                instance.nrsv[j,i].value = 0
+            instance.on[j,i].value = on
+            instance.switch[j,i].value = max(on-on_prev,0)
+            on_prev = on
+    cost = pyo.value(instance.SystemCost)
+    if cost - bound > lp_gap*max(abs(cost),1):
+        return None
+    return relaxed
+
+
+###Load the hourly data of the horizon; T[i] is the hour of the simulation for hour i of the horizon
+def load_horizon(instance, T, K):
+    for z in instance.d_nodes:
+     #load Demand and Reserve time series data
+        for i in K:
+            instance.HorizonDemand[z,i] = instance.SimDemand[z,T[i]]
+            instance.HorizonReserves[i] = instance.SimReserves[T[i]] 
+
+    for z in instance.h_nodes:
+    #load Hydropower time series data
+        for i in K:
+            instance.HorizonHydro[z,i] = instance.SimHydro[z,T[i]]
+
+    for z in instance.s_nodes:
+    #load Solar time series data
+        for i in K:
+            instance.HorizonSolar[z,i] = instance.SimSolar[z,T[i]]
+
+    for z in instance.Generators:
+     #load Deratef time series data
+        for i in K:
+            instance.HorizonDeratef[z,i] = instance.SimDeratef[z,T[i]]
+
+
+###MIP start: the schedule solved `lag` hours earlier (previous day or same day of the previous week)
+###shifted to the hours of the horizon, with the start-ups following from the shifted commitment.
+###schedule holds {var: {(generator, hour of the simulation): value}} of the solved hours.
+warm_start_lag = {'day': 24, 'week': 168}
+
+def shifted_start(schedule, T, K, lag, ini_on):
+    start = {a: {} for a in ['on','switch','mwh','srsv','nrsv']}
+    for j, on_prev in ini_on.items():
+        start['on'][j,0] = on_prev
+        start['switch'][j,0] = 0
+        for i in K:
+            key = (j, T[i]-lag)
+            if key not in schedule['on']:
+                break
+            on = round(schedule['on'][key])
+            start['on'][j,i] = on
+            start['switch'][j,i] = max(on-on_prev,0)
+            for a in ['mwh','srsv','nrsv']:
+                start[a][j,i] = schedule[a][key]
+            on_prev = on
+    return start
+
+
+###Entities of the result variables, in the order of the rows of a step solution and of the columns of
+###the result buffers
+def result_entities(d):
+    gens = d.df_gen['name'].str.replace(' ','_').tolist()
+    entities = {'mwh': gens, 'on': gens, 'switch': gens, 'srsv': gens, 'nrsv': gens, 'hydro': d.h_nodes, 'solar': d.s_nodes}
+    if d.network == 'angles': ##no angles in the other formulations
+        entities['vlt_angle'] = d.all_nodes
+    return entities
+
+
+###End state of a step: commitment and output at hour `commit`, the initial state of the next step
+def end_state(solution, commit, gens):
+    ini_on = dict(zip(gens, np.round(solution['on'][:,commit-1]).astype(int).tolist()))
+    ini_mwh = dict(zip(gens, np.maximum(solution['mwh'][:,commit-1],0).tolist()))
+    return ini_on, ini_mwh
+
+
+###Flags of a step from its solver statistics: stopped at a limit (with or without a solution), other termination
+###than optimal, gap above flag_gap
+def step_flags(stats, flag_gap):
+    flags = []
+    if stats['status'] in ('limit', 'feasible', 'no_solution'):
+        flags.append('limit' if stats['status'] == 'no_solution' else stats['status'])
+    if stats['gap'] is not None and stats['gap'] > flag_gap:
+        flags.append('gap')
+    return flags
+
+
+###Add the time since t to a phase of a step (see pownet_output.py for the phases); returns the current time
+def lap(phases, name, t):
+    now = time.perf_counter()
+    phases[name] = phases.get(name, 0) + now - t
+    return now
+
+
+######=================================================########
+######               Segment C.3                       ########
+######=================================================########
+
+###import data and creat instance (dat_file: read the instance from this .dat file instead)
+def build_step_solver(d, dat_file=None, solver_name=solver_name, persistent=persistent, engine=engine, threads=threads,
+                      time_limit=time_limit, mip_gap=mip_gap):
+    s = SimpleNamespace(engine=engine, persistent=persistent, lp_gap=d.lp_gap, entities=result_entities(d), solver_name=solver_name,
+                        threads=threads, time_limit=time_limit, mip_gap=mip_gap, unlimited=None)
+    if engine == 'matrix':
+        from pownet_matrix import build_matrix
+        s.mm = build_matrix(d, threads, time_limit, mip_gap)
+    elif dat_file:
+        s.instance = model.create_instance(dat_file)
+    else:
+        s.instance = model.create_instance(data=build_data(d))
+
+    ##positions (entity row, hour column) of the values of each variable, in the order of its index
+    if engine == 'pyomo':
+        s.layout = {}
+        for a, entities in s.entities.items():
+            row = {z: n for n, z in enumerate(entities)}
+            index = list(getattr(s.instance, a).keys())
+            rows = np.array([row.get(z, -1) for z, i in index])
+            hours = np.array([i for z, i in index])
+            keep = (rows >= 0) & (hours > 0)
+            s.layout[a] = (keep, rows[keep], hours[keep]-1)
+
+    ##solver and number of threads to use for simulation
+    opt = None if engine == 'matrix' else step_solver(solver_name, persistent, threads, time_limit, mip_gap) ##matrix: HiGHS is called by pownet_matrix.py
+    s.opt = opt
+
+    ##LP fast path (Pyomo engine only, and not with a persistent solver, whose variables are not updated between solves)
+    s.lp_path = d.lp_candidate and not persistent and engine == 'pyomo'
+    ##MIP start (the Pyomo engine passes it only to solvers that take one)
+    s.warm_start_capable = opt is None or opt.warm_start_capable()
+    return s
+
+
+def step_solver(solver_name, persistent, threads, time_limit, mip_gap):
+    if not persistent:
+        return make_solver(solver_name, False, threads, time_limit, mip_gap)
+    # Pyomo APPSI interface: the model is loaded into the solver once. Between days only
+    # the Horizon* params and ini_on/ini_mwh change, so the structural checks are skipped
+    # and each solve only pushes the new param values (right-hand sides and coefficients)
+    opt = make_solver(solver_name, True, threads, time_limit, mip_gap)
+    opt.update_config.check_for_new_or_removed_constraints = False
+    opt.update_config.check_for_new_or_removed_vars = False
+    opt.update_config.check_for_new_or_removed_params = False
+    opt.update_config.check_for_new_objective = False
+    opt.update_config.update_constraints = False
+    opt.update_config.update_vars = False
+    opt.update_config.update_named_expressions = False
+    opt.update_config.update_objective = False
+    return opt
+
+
+###Solver of the steps stopped at the time limit before finding a feasible solution: the same one without the limit
+def unlimited_solver(s):
+    if s.unlimited is None:
+        s.unlimited = step_solver(s.solver_name, s.persistent, s.threads, None, s.mip_gap)
+    return s.unlimited
+
+
+######=================================================########
+######               Segment C.4                       ########
+######=================================================########
+
+###Solve one step from the initial state (ini_on, ini_mwh); T[i] is the hour of the simulation for hour i
+###of the horizon. Returns the values of each variable of s.entities as an array (entity x hour, hour 1 in column 0);
+###the times of its phases and the solver statistics (see pownet_backends.py) are left in s.phases and s.stats.
+###A step stopped at the time limit before finding a feasible solution is solved again without the limit; its
+###status stays no_solution (flagged as limit), with the termination of the first solve and the rest of the
+###statistics of the second.
+def solve_step(s, T, K, ini_on, ini_mwh, start=None):
+    phases = s.phases = {}
+    t = time.perf_counter()
+    if s.engine == 'matrix':
+        from pownet_matrix import set_horizon, set_initial, set_start, set_time_limit, solve_matrix
+        set_initial(s.mm, ini_on, ini_mwh)
+        set_horizon(s.mm, [T[i] for i in K])
+        if start:
+            set_start(s.mm, start)
+        lap(phases, 'horizon', t)
+        sol = solve_matrix(s.mm)
+        phases.update(sol.times)
+        s.stats = dict(sol.stats, status=sol.status)
+        if sol.status == 'no_solution':
+            print('No feasible solution within the time limit from hour %d, solved again without it' % T[1])
+            set_time_limit(s.mm, None)
+            if start:
+                set_start(s.mm, start)
+            sol = solve_matrix(s.mm)
+            set_time_limit(s.mm, s.time_limit)
+            for name, value in sol.times.items():
+                phases[name] += value
+            if sol.status == 'no_solution':
+                raise RuntimeError('HiGHS: %s without the time limit' % sol.message)
+            s.stats = dict(sol.stats, status='no_solution', termination=s.stats['termination'])
+        return {a: sol.values[a] for a in s.entities}
+
+    instance, opt = s.instance, s.opt
+    for z in instance.Generators:
+        instance.ini_on[z] = ini_on[z]
+        instance.ini_mwh[z] = ini_mwh[z]
+    load_horizon(instance, T, K)
+    t = lap(phases, 'horizon', t)
+
+    result = None
+    if s.lp_path:
+        result = solve_relaxed(instance, opt, K, s.lp_gap)
+        t = lap(phases, 'lp_path', t)
+        if result is not None: ##the rounded schedule against the LP bound
+            s.stats = dict(solve_statistics(opt, result), status='lp_path', objective=pyo.value(instance.SystemCost),
+                           bound=number(result.problem.lower_bound))
+            s.stats['gap'] = relative_gap(s.stats['objective'], s.stats['bound'])
+        else:
+            ##the gap comes from the fixed and start-up costs of the fleet, so it is not retried
+            s.lp_path = False
+            print('LP fast path: not within lp_gap of the LP bound from hour %d, full MIP for the rest of the run' % T[1])
+    if result is None:
+        kwargs = {}
+        if start:
+            for a, values in start.items():
+                varobject = getattr(instance, a)
+                for index in varobject:
+                    varobject[index].value = values.get(index) ##hours without a shifted value are left to the solver
+            kwargs['warmstart'] = True
+        t = lap(phases, 'horizon', t)
+        result, status, t = solve_mip(s, opt, phases, t, kwargs)
+        if status == 'no_solution':
+            print('No feasible solution within the time limit from hour %d, solved again without it' % T[1])
+            termination = str(result.solver.termination_condition)
+            opt = unlimited_solver(s)
+            result, status, t = solve_mip(s, opt, phases, t, kwargs)
+            if status == 'no_solution':
+                raise RuntimeError('%s: no feasible solution without the time limit (%s)' % (s.solver_name, result.solver.termination_condition))
+            s.stats = dict(solve_statistics(opt, result), status='no_solution', termination=termination)
+        else:
+            s.stats = dict(solve_statistics(opt, result), status=status)
+
+    ##one bulk read per variable, placed at the precomputed positions
+    solution = {}
+    for a, (keep, rows, hours) in s.layout.items():
+        values = np.array(list(getattr(instance, a).extract_values().values()), dtype=float)
+        solution[a] = np.zeros((len(s.entities[a]), len(K)))
+        solution[a][rows, hours] = values[keep]
+    lap(phases, 'extract', t)
+    return solution
+
+
+###MIP solve of a step into s.instance: its times are added to the solve, write and load phases; returns the
+###result, its status (see pownet_backends.py) and the current time
+def solve_mip(s, opt, phases, t, kwargs):
+    result = opt.solve(s.instance, load_solutions=False, **kwargs) ##,tee=True to check number of variables
+    elapsed = time.perf_counter() - t
+    own = solver_time(result)
+    if own is None:
+        own = elapsed
+    else: ##the rest is Pyomo writing (or updating) the model and reading the results
+        phases['write'] = phases.get('write', 0) + max(elapsed - own, 0)
+    phases['solve'] = phases.get('solve', 0) + own
+    t = time.perf_counter()
+    # s.instance.display()
+    status = load_result(s.instance, result, s.solver_name) ##raises when there is no feasible solution but at a limit
+    t = lap(phases, 'load', t)
+    return result, status, t
+
+
+###Parallel mode: all steps are solved at once in a process pool, the first round from the initial
+###state of the data (a guess for every step but the first). Each further round re-solves, again in
+###parallel, the steps whose assumed initial state differs from the end state of the step before,
+###until all agree; the result is that of the sequential run. With weak coupling between days (no
+###minimum up/down times, ramps that do not bind) most steps are settled in the first two rounds.
+###A step is confirmed once it was solved from the end state of the confirmed step before it; the steps
+###are yielded in order as soon as they are confirmed, and only the unconfirmed ones are kept.
+worker_solver = None   ##step solver of a worker process
+
+def init_worker(*args):
+    global worker_solver
+    worker_solver = build_step_solver(*args)
+
+def solve_step_worker(args):
+    solution = solve_step(worker_solver, *args)
+    return solution, worker_solver.phases, worker_solver.stats
+
+def same_state(a, b, tol=1e-6):
+    return a[0] == b[0] and all(abs(a[1][z]-b[1][z]) <= tol*max(abs(b[1][z]),1) for z in b[1])
+
+def solve_parallel(steps, K, ini, gens, workers, solver_args):
+    assumed = [ini]*len(steps)
+    solved = {} ##solution and solver statistics of the last solve of the unconfirmed steps
+    phases = [{} for step in steps] ##summed over the rounds
+    todo = list(range(len(steps)))
+    confirmed, realized = 0, ini ##first unconfirmed step and its initial state
+    n_solves = n_rounds = 0
+    with ProcessPoolExecutor(workers, initializer=init_worker, initargs=solver_args) as pool:
+        while todo:
+            jobs = [(steps[n][2], K, *assumed[n]) for n in todo]
+            for n in todo: ##solved from a former assumption
+                solved.pop(n, None)
+            n_solves += len(todo)
+            n_rounds += 1
+            for n, (solution, times, step_stats) in zip(todo, pool.map(solve_step_worker, jobs)):
+                solved[n] = solution, step_stats
+                for name, value in times.items():
+                    phases[n][name] = phases[n].get(name, 0) + value
+                while confirmed in solved and same_state(assumed[confirmed], realized):
+                    solution, step_stats = solved.pop(confirmed)
+                    realized = end_state(solution, steps[confirmed][1], gens)
+                    if confirmed == len(steps)-1:
+                        print('Parallel: %d steps settled with %d solves in %d rounds' % (len(steps), n_solves, n_rounds))
+                    yield solution, phases[confirmed], step_stats
+                    phases[confirmed] = None
+                    confirmed += 1
+            todo = []
+            state = realized
+            for n in range(confirmed, len(steps)):
+                if not same_state(assumed[n], state):
+                    assumed[n] = state
+                    todo.append(n)
+                state = end_state(solved[n][0], steps[n][1], gens)
+
+
+######=================================================########
+######               Segment C.5                       ########
+######=================================================########
+
+###Run one scenario; outputs go to <workdir>/output unless output_dir is given
+def run_scenario(d, start=start, end=end, run_no=run_no, use_dat=use_dat, output_dir=None,
+                 solver_name=solver_name, persistent=persistent, engine=engine, warm_start=warm_start,
+                 workers=workers, output_format=output_format, checkpoint_steps=checkpoint_steps, resume=resume,
+                 stream_results=stream_results, threads=threads, time_limit=time_limit, mip_gap=mip_gap,
+                 flag_gap=flag_gap):
+    yr = d.yr
+    if output_dir is None:
+        output_dir = os.path.join(d.workdir, 'output')
+    os.makedirs(output_dir, exist_ok=True)
+    print(d.network_note)
+    print(d.commitment_note)
+
+    dat_file = None
+    if use_dat and engine == 'pyomo':
+        dat_file = os.path.join(d.workdir,'input',d.data_name+'.dat')
+        os.makedirs(os.path.dirname(dat_file), exist_ok=True)
+        build_dat_file(d, dat_file)
+    solver_args = (d, dat_file, solver_name, persistent, engine, threads, time_limit, mip_gap)
+    s = build_step_solver(*solver_args) if workers <= 1 else None
+
+    H = d.HorizonHours
+    K=range(1,H+1)
+    sim_hours = d.SimHours
+
+    if d.lp_candidate and persistent:
+        print('LP fast path: off with a persistent solver')
+    if d.lp_candidate and engine == 'matrix':
+        print('LP fast path: off with the matrix engine')
+    if warm_start and workers > 1:
+        print('Warm start: off in parallel mode')
+        warm_start = None
+    if warm_start and not s.warm_start_capable:
+        print('Warm start: off, %s does not take a MIP start' % solver_name)
+        warm_start = None
+    schedule = {a: {} for a in ['on','mwh','srsv','nrsv']}
+
+###Run simulation and save outputs
+
+    ##rolling horizon: each solve covers H = commit_hours + lookahead_hours from hour t0+1 of the
+    ##simulation, keeps the first `commit` hours and starts the next solve from the state at hour `commit`
+    first_hour = (start-1)*24
+    last_hour = end*24
+    steps = []
+    for t0 in range(first_hour,last_hour,d.commit_hours):
+        commit = min(d.commit_hours,last_hour-t0)
+        T = {i: min(t0+i,sim_hours) for i in K} ##hour of the simulation (a look-ahead past the last hour repeats it)
+        steps.append((t0, commit, T))
+
+#Space to store results: day x hour x entity for each variable
+    prefix = result_prefix(output_dir,run_no,yr)
+    entities = result_entities(d)
+    days = end-start+1
+
+    gens = entities['mwh']
+    ini_on_ = dict(zip(gens, d.df_gen['ini_on']))
+    ini_mwh_ = dict(zip(gens, d.df_gen['ini_mwh']))
+
+    ##checkpoint: results and state after the last completed step, resumed by the same run only
+    checkpoint = prefix+'_checkpoint.npz'
+    run = 'start=%d end=%d commit_hours=%d lookahead_hours=%d network=%s stream=%s' % (
+        start, end, d.commit_hours, d.lookahead_hours, d.network, stream_results)
+    resumed = resume and os.path.exists(checkpoint)
+    if resumed:
+        c = read_checkpoint(checkpoint, run)
+        results = open_results(prefix, entities, days, stream_results, resume=True)
+        for a, values in c.results.items():
+            results[a][...] = values
+        ini_on_, ini_mwh_ = dict(zip(gens, c.ini_on)), dict(zip(gens, c.ini_mwh))
+        steps = [step for step in steps if step[0] >= c.next_hour]
+        print('Resuming from hour %d (%s)' % (c.next_hour+1, checkpoint))
+        if warm_start: ##schedule of the committed hours before the checkpoint
+            for t in range(max(c.next_hour-warm_start_lag[warm_start],first_hour), c.next_hour):
+                for a in schedule:
+                    values = results[a].reshape(days*24,-1)[t-first_hour]
+                    schedule[a].update({(g,t+1): values[row] for row, g in enumerate(gens)})
+    else:
+        if resume:
+            print('Resume: no checkpoint in %s, starting from day %d' % (output_dir, start))
+        results = open_results(prefix, entities, days, stream_results)
+
+    if workers > 1: ##the steps in order, each as soon as it is confirmed
+        confirmed = solve_parallel(steps, K, (ini_on_, ini_mwh_), gens, workers, solver_args)
+
+    ##solver statistics and timing of the phases of each step, one JSON record per line (when resuming, after
+    ##those of the steps before the checkpoint; the later ones are solved again)
+    metrics_file = prefix+'_metrics.jsonl'
+    kept = []
+    if resumed and os.path.exists(metrics_file):
+        with open(metrics_file) as f:
+            kept = [line for line in f if json.loads(line)['hour'] <= c.next_hour]
+    records = []
+    with open(metrics_file, 'w') as metrics:
+        metrics.writelines(kept)
+
+        for n, (t0, commit, T) in enumerate(steps):
+            t = time.perf_counter()
+            if workers > 1:
+                solution, phases, stats = next(confirmed)
+            else:
+                mip_start = None
+                if warm_start and t0 > first_hour:
+                    mip_start = shifted_start(schedule, T, K, warm_start_lag[warm_start], ini_on_)
+                handoff = time.perf_counter() - t
+                solution = solve_step(s, T, K, ini_on_, ini_mwh_, mip_start)
+                phases, stats = dict(s.phases, handoff=handoff), s.stats
+            flags = step_flags(stats, flag_gap)
+            if flags:
+                print('Day %d (hour %d) flagged: %s (%s, gap %s)' % (t0//24+1, t0+1, ', '.join(flags), stats['termination'],
+                      'unknown' if stats['gap'] is None else '%.2f%%' % (100*stats['gap'])))
+            t = time.perf_counter()
+
+#  #The following section is for storing results: the committed hours of the step
+            for a in results:
+                results[a].reshape(days*24,-1)[t0-first_hour:t0-first_hour+commit] = solution[a][:,:commit].T
+            t = lap(phases, 'extract', t)
+
+            if warm_start:
+                lag = warm_start_lag[warm_start]
+                for a in schedule:
+                    for row, g in enumerate(gens):
+                        schedule[a].update({(g,T[i]): solution[a][row,i-1] for i in K})
+                    schedule[a] = {key: value for key, value in schedule[a].items() if key[1] > t0+commit-lag}
+
+            # Update initialization values for "on" and "mwh"
+            ini_on_, ini_mwh_ = end_state(solution, commit, gens)
+            t = lap(phases, 'handoff', t)
+            if checkpoint_steps and (n+1) % checkpoint_steps == 0 and n+1 < len(steps):
+                write_checkpoint(checkpoint, run, t0+commit, results, [ini_on_[g] for g in gens], [ini_mwh_[g] for g in gens])
+                lap(phases, 'checkpoint', t)
+
+            record = step_record(t0, phases, stats, flags)
+            metrics.write(json.dumps(record)+'\n')
+            metrics.flush()
+            records.append(record)
+            print(t0//24+1)
+            print(str(datetime.now()))
+
+    if workers > 1:
+        next(confirmed, None) ##shuts the pool down
+
+###save outputs (out_Cornell_R<run_no>_<yr>_<var>.csv, see pownet_output.py for the other formats)
+    t = time.perf_counter()
+    write_results(prefix, results, entities, first_hour, output_format)
+    close_results(prefix, results)
+    print_metrics(records, time.perf_counter()-t)
+    if os.path.exists(checkpoint): ##the run is complete
+        os.remove(checkpoint)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run the daily unit commitment of a scenario')
+    parser.add_argument('scenario', nargs='?', default=scenario, choices=list_scenarios())
+    parser.add_argument('--start', type=int, default=start, help='first day of simulation')
+    parser.add_argument('--end', type=int, default=end, help='last day of simulation')
+    parser.add_argument('--solver', default=solver_name, help='solver used for the daily problems (see pownet_backends.py)')
+    parser.add_argument('--threads', type=int, default=threads, help='solver threads of each solve')
+    parser.add_argument('--time-limit', type=float, default=time_limit, help='seconds per solve')
+    parser.add_argument('--mip-gap', type=float, default=mip_gap, help='relative MIP gap of each solve')
+    parser.add_argument('--flag-gap', type=float, default=flag_gap, help='flag the steps left with a larger relative MIP gap')
+    parser.add_argument('--persistent', action='store_true', default=persistent,
+                        help='keep the model resident in the solver between days')
+    parser.add_argument('--workers', type=int, default=workers,
+                        help='processes solving the steps in parallel from speculative initial states')
+    parser.add_argument('--resume', action='store_true', default=resume,
+                        help='continue from the checkpoint of an interrupted run in the output directory')
+    parser.add_argument('--checkpoint-steps', type=int, default=checkpoint_steps,
+                        help='steps between checkpoints (0: none)')
+    parser.add_argument('--stream-results', action='store_true', default=stream_results,
+                        help='keep the results in disk-backed arrays instead of memory')
+    parser.add_argument('--output-format', nargs='+', choices=output_formats, default=output_format,
+                        help='result files to write')
+    parser.add_argument('--warm-start', choices=['day','week'], default=warm_start,
+                        help='start each MIP from the schedule of the previous day or of the same day of the previous week')
+    parser.add_argument('--engine', choices=['pyomo','matrix'], default=engine,
+                        help='build the daily problem with Pyomo or as a sparse matrix solved by HiGHS directly')
+    parser.add_argument('--network', choices=['angles','ptdf','copperplate'],
+                        help='DC power flow formulation, used as given (default: the scenario setting, '
+                             'reduced to copperplate when no line limit can bind and copper_plate is set)')
+    parser.add_argument('--commit-hours', type=int, help='hours committed by each solve (default: the scenario setting)')
+    parser.add_argument('--lookahead-hours', type=int, help='hours solved beyond the committed ones (default: the scenario setting)')
+    args = parser.parse_args()
+
+    overrides = {}
+    if args.commit_hours:
+        overrides['commit_hours'] = args.commit_hours
+    if args.lookahead_hours is not None:
+        overrides['lookahead_hours'] = args.lookahead_hours
+    if args.network:
+        overrides['network'] = args.network
+        overrides['copper_plate'] = False
+    run_scenario(load_scenario(args.scenario, **overrides), start=args.start, end=args.end,
+                 solver_name=args.solver, persistent=args.persistent, engine=args.engine,
+                 warm_start=args.warm_start, workers=args.workers, output_format=args.output_format,
+                 checkpoint_steps=args.checkpoint_steps, resume=args.resume, stream_results=args.stream_results,
+                 threads=args.threads, time_limit=args.time_limit, mip_gap=args.mip_gap,
+                 flag_gap=args.flag_gap)